@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import numpy as np
+import jsspetri
+import gymnasium as gym
+
+#%% episode throughput benchmark
+# run it once on the reference revision (it saves benchmark_baseline.json) , then on the changed revision to print
+# the speedup of every instance against the saved baseline
+
+
+def run_episode(env, rng):
+    """
+    Run one episode with random enabled actions.
+    Returns:
+        tuple: makespan and number of steps of the episode.
+    """
+    obs, info = env.reset()
+    terminated, steps = False, 0
+
+    while not terminated:
+        action = rng.choice(np.flatnonzero(env.action_masks()))
+        obs, reward, terminated, truncated, info = env.step(action)
+        steps += 1
+
+    return env.sim.clock, steps
+
+
+def benchmark(env_id="jsspetri-fms-v0", instances=("ta61",), episodes=5, seed=0, **kwargs):
+    """
+    Measure the episode throughput of an environment on some instances.
+    Parameters:
+        env_id (str): Registered id of the environment.
+        instances (list): Instances to run.
+        episodes (int): Episodes per instance.
+        kwargs: Extra arguments of the environment.
+    Returns:
+        dict: Episodes per second and steps per second of every instance.
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    for instance_id in instances:
+        env = gym.make(env_id, instance_id=instance_id, **kwargs).unwrapped
+
+        start_time = time.time()
+        steps = sum(run_episode(env, rng)[1] for _ in range(episodes))
+        elapsed_time = time.time() - start_time
+
+        results[instance_id] = (episodes / elapsed_time, steps / elapsed_time)
+        print(f"{env_id} {instance_id} ({env.sim.n_jobs}x{env.sim.n_machines}): "
+              f"{results[instance_id][0]:.3f} episodes/s , {results[instance_id][1]:.0f} steps/s")
+
+    return results
+
+
+def compare(baseline, results):
+    """
+    Print the throughput of some results against a baseline (the results of the reference revision).
+    Parameters:
+        baseline (dict): Episodes per second and steps per second of every instance on the reference revision.
+        results (dict): Episodes per second and steps per second of every instance on the changed revision.
+    Returns:
+        dict: Steps per second speedup of every instance measured in both.
+    """
+    speedups = {}
+
+    for key in results:
+        if key not in baseline:
+            continue
+        speedups[key] = results[key][1] / baseline[key][1]
+        print(f"{key} : {baseline[key][1]:.0f} -> {results[key][1]:.0f} steps/s ({speedups[key]:.2f}x)")
+
+    if speedups:
+        print(f" mean speedup : {np.mean(list(speedups.values())):.2f}x \n")
+    return speedups
+
+
+if __name__ == "__main__":
+
+    taillard_50x20 = [f"ta{i}" for i in range(61, 71)]
+    taillard_100x20 = [f"ta{i}" for i in range(71, 81)]
+
+    baseline_file = "benchmark_baseline.json"
+    measured = {}
+
+    for instances in [taillard_50x20, taillard_100x20]:
+        for env_id in ["jsspetri-fms-v0", "jsspetri-v0"]:
+            results = benchmark(env_id, instances, episodes=3)
+            episodes_s = np.mean([r[0] for r in results.values()])
+            steps_s = np.mean([r[1] for r in results.values()])
+            print(f" {env_id} mean : {episodes_s:.3f} episodes/s , {steps_s:.0f} steps/s \n")
+            measured.update({f"{env_id} {instance_id}": result for instance_id, result in results.items()})
+
+    if os.path.exists(baseline_file):
+        with open(baseline_file) as file:
+            compare(json.load(file), measured)
+    else:
+        with open(baseline_file, "w") as file:
+            json.dump(measured, file, indent=1)
+        print(f"baseline saved to {baseline_file}")
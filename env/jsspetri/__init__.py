@@ -6,6 +6,7 @@ from gymnasium.envs.registration import register
 register(
     id="jsspetri-v0",
     entry_point="jsspetri.envs.mono.gym_env:MonoEnv",
+    vector_entry_point="jsspetri.envs.mono.vector_env:MonoVectorEnv",
 )
 
 # Register the 'jsspetri-multi' environment
@@ -25,5 +26,6 @@ register(
 register(
     id="jsspetri-fms-v0",
     entry_point="jsspetri.envs.fms.gym_env:FmsEnv",
+    vector_entry_point="jsspetri.envs.fms.vector_env:FmsVectorEnv",
 )
 
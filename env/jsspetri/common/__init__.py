@@ -1,4 +1,6 @@
-from jsspetri.common.instance_loader import load_instance
-from jsspetri.common.build_blocks import  Token,Place,Transition
+from jsspetri.common.instance_loader import load_instance, Instance
+from jsspetri.common.build_blocks import  Token,Place,Transition,EventLog,JobStats
 from jsspetri.common.petri_build import Petri_build
-
+from jsspetri.common.array_build import Array_build
+from jsspetri.common.decoder import Decoder
+from jsspetri.common.lower_bounds import LowerBounds
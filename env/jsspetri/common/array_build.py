@@ -0,0 +1,124 @@
+import copy
+import numpy as np
+from jsspetri.common.instance_loader import load_instance ,load_trans
+
+
+class Array_build:
+    """
+    Array counterpart of Petri_build : instead of places holding token objects, the
+    operations of the JSSP instance are compiled into flat NumPy arrays (one entry per operation,
+    ordered job by job) that the array simulators index directly.
+
+    Attributes:
+        instance_id (str): The ID of the JSSP instance.
+        n_jobs (int): The number of jobs in the instance.
+        n_machines (int): The number of machines in the instance.
+        max_bound (int): The maximum value found in the instance.
+        n_ops (int): The total number of operations.
+
+        op_job (np.ndarray): Job of every operation.
+        op_machine (np.ndarray): Machine requested by every operation.
+        op_order (np.ndarray): Order of every operation in its job.
+        op_process_time (np.ndarray): Processing time of every operation.
+        op_trans_time (np.ndarray): Transport time from the machine of the previous operation.
+        op_features (np.ndarray): Remaining features of every operation (n_ops x n_features-1).
+        job_first_op (np.ndarray): Index of the first operation of every job.
+        job_last_op (np.ndarray): Index after the last operation of every job.
+        state_attributes (tuple): Dynamic attributes of the simulators copied by fork.
+    """
+    state_attributes = ()
+
+    def __init__(self, instance_id,
+                 benchmark = "Taillard",
+                 trans_layout = None,
+                 dynamic=False,
+                 standby=False,
+                 trans=False,
+                 max_size=(100,20)):
+        """
+        Initialize the operation arrays with a JSSP instance.
+        Parameters:
+            instance_id (str): The ID of the JSSP instance.
+        """
+        self.dynamic=dynamic
+        self.standby=standby
+        self.trans=trans
+        self.benchmark = benchmark
+        self.trans_layout = trans_layout
+
+        self.instance_id = instance_id
+        self.instance, specs = load_instance(instance_id = self.instance_id, benchmark = self.benchmark)
+        self.n_jobs, self.n_machines, self.n_features,self.max_bound = specs
+
+        self.tran_durations = None
+        if self.trans :
+            self.tran_durations = load_trans(self.n_machines,
+                                             benchmark = self.benchmark,
+                                             trans_layout = self.trans_layout)
+        self.trans_times = self.instance.trans_times(self.tran_durations)
+
+        if  self.dynamic :
+            self.n_jobs,self.n_machines=max_size
+
+        self.compile_operations()
+
+    def __str__(self):
+        """
+        Get a string representation of the instance.
+        Returns:
+            str: A string representing the instance.
+        """
+        return f"JSSP {self.instance_id}: {self.n_jobs} jobs X {self.n_machines} machines"
+
+    def compile_operations(self):
+        """
+        Compile the instance into flat operation arrays, the same operations and transport times
+        Petri_build.add_tokens puts in the job places.
+        """
+        valid = self.instance.valid
+        jobs, orders = np.nonzero(valid)   # job by job , in the order of the operations
+
+        self.n_ops = len(jobs)
+        self.op_job = jobs.astype(np.int64)
+        self.op_machine = self.instance.machines[valid]
+        self.op_order = orders.astype(np.int64)
+        self.op_process_time = self.instance.process_times[valid].astype(np.float64)
+        self.op_trans_time = self.trans_times[valid]
+        self.op_features = self.instance.features[valid].astype(np.float64)
+
+        # the reserve jobs of the dynamic variant are empty
+        job_n_ops = np.zeros(self.n_jobs, dtype=np.int64)
+        job_n_ops[:len(self.instance)] = self.instance.n_ops
+        self.job_last_op = np.cumsum(job_n_ops)
+        self.job_first_op = self.job_last_op - job_n_ops
+
+    def fork(self):
+        """
+        Copy the dynamic state of the simulation, the operation arrays are shared.
+        Returns:
+            dict: State to pass to restore.
+        """
+        return {name: copy.copy(getattr(self, name)) for name in self.state_attributes}
+
+    def restore(self, state):
+        """
+        Restore a state taken by fork (the state can be restored several times).
+        Parameters:
+            state (dict): State returned by fork.
+        """
+        for name in self.state_attributes:
+            value = state[name]
+            if isinstance(value, np.ndarray):
+                getattr(self, name)[...] = value   # in place , the masks are handed out by reference
+            else:
+                setattr(self, name, value)
+
+
+# %% Test
+if __name__ == "__main__":
+
+    benchmark='BU'
+    instance_id="bu01"
+
+    arrays=Array_build(instance_id,trans=True , benchmark=benchmark)
+    print(arrays, arrays.op_machine, arrays.op_trans_time)
@@ -1,3 +1,7 @@
+from collections import deque
+import numpy as np
+
+
 class IdGen:
     """
     Class for generating unique IDs.
@@ -13,6 +17,8 @@ class IdGen:
 class Place:
     """
     Class representing a place in a Petri net.
+    The places and their arcs are shared by all the nets of the same shape , the tokens and the busy flag of a place
+    are held by the PlaceMarking of every net.
 
     Attributes:
         uid (str): Unique identifier for the place.
@@ -20,7 +26,6 @@ class Place:
         type (str): Type or role of the place.
         parents (list): List of parent nodes (transitions).
         children (list): List of child nodes (transitions).
-        token_container (list): List of tokens currently in the place.
         color: Color attribute for the place.
     """
 
@@ -37,11 +42,9 @@ class Place:
         self.label = label
         self.type = type_
         self.color = color
-        self.busy= False  #  True if job is processing , or machine prosessing , or  token ready 
         
         self.parents = []
         self.children = []
-        self.token_container = []
 
      
 
@@ -65,7 +68,41 @@ class Place:
         Returns:
             str: A string representing the place.
         """
-        return f"Place name: {self.label}, type: {self.type}, Tokens: {len(self.token_container)}, color: {self.color}, parents: {self.parents}, children: {self.children}, id: {self.uid}"
+        return f"Place name: {self.label}, type: {self.type}, color: {self.color}, parents: {self.parents}, children: {self.children}, id: {self.uid}"
+
+
+class PlaceMarking:
+    """
+    Marking of a place in one net : its tokens and its busy flag. The other attributes of the place
+    (label , arcs , ...) are read from the shared place.
+
+    Attributes:
+        place (Place): The shared place.
+        uid (str), type (str), color: The uid , type and color of the place.
+        busy (bool): True if the job is processing , the machine is processing or the ready token arrived.
+        token_container (deque): Queue of tokens currently in the place.
+    """
+    __slots__ = ("place", "uid", "type", "color", "busy", "token_container")
+
+    def __init__(self, place):
+        """
+        Initialize an empty marking of a place.
+
+        Parameters:
+            place (Place): The shared place.
+        """
+        self.place = place
+        self.uid, self.type, self.color = place.uid, place.type, place.color
+        self.busy = False
+        self.token_container = deque()
+
+    def __getattr__(self, name):
+        if name == "place":   # not set yet (e.g. while unpickling)
+            raise AttributeError(name)
+        return getattr(self.place, name)
+
+    def __str__(self):
+        return f"{self.place} , Tokens: {len(self.token_container)}, busy: {self.busy}"
 
 
 class Transition:
@@ -121,6 +158,147 @@ class Transition:
 
 
 
+class EventLog:
+    """
+    Preallocated log of the operations (tokens) going through the stages of the Petri net,
+    job -> ready -> machine -> finished_ops , in place of a logging dict per token.
+
+    Attributes:
+        times (np.ndarray): Entry time, leave time and elapsed time of every operation in every stage (n_ops x 4 x 3).
+        stage (np.ndarray): Current stage of every operation.
+        stage_uids (list): For every stage, the uids of its places indexed by color (job color for job/ready, machine color for machine/finished_ops).
+    """
+    JOB, READY, MACHINE, DELIVERY = 0, 1, 2, 3
+
+    def __init__(self, n_ops, stage_uids):
+        """
+        Initialize the log.
+
+        Parameters:
+            n_ops (int): Number of operations to log.
+            stage_uids (list): Uids of the places of every stage indexed by color.
+        """
+        self.times = np.zeros((n_ops, 4, 3), dtype=np.int64)
+        self.stage = np.zeros(n_ops, dtype=np.int64)
+        self.stage_uids = stage_uids
+
+    def reset(self):
+        """
+        Put all the operations back in the job stage.
+        """
+        self.times[:] = 0
+        self.stage[:] = self.JOB
+
+    def move(self, op_id, clock):
+        """
+        Log the move of an operation to the next stage.
+
+        Parameters:
+            op_id (int): Index of the operation.
+            clock (int): Current simulation clock.
+        """
+        stage = self.stage[op_id]
+        self.times[op_id, stage, 1] = clock
+        self.times[op_id, stage + 1] = (clock, 0, 0)
+        self.stage[op_id] = stage + 1
+
+    def tick(self, op_id, step=1):
+        """
+        Increment the elapsed time of an operation in its current stage.
+        """
+        self.times[op_id, self.stage[op_id], 2] += step
+
+    def elapsed(self, op_id):
+        """
+        Returns:
+            int: Elapsed time of an operation in its current stage.
+        """
+        return self.times[op_id, self.stage[op_id], 2]
+
+    def logging(self, token):
+        """
+        Build the logging dict of a token from the log (read only view).
+
+        Returns:
+            dict: Entry time, leave time and elapsed time for each place the token went through.
+        """
+        colors = (token.color[0], token.color[0], token.color[1], token.color[1])
+        return {self.stage_uids[stage][colors[stage]]: self.times[token.op_id, stage].tolist()
+                for stage in range(self.stage[token.op_id] + 1)}
+
+
+
+class JobStats:
+    """
+    Per job statistics maintained on every move of the event log (O(1) per move) , shared by the heuristics,
+    the observations and the rewards. The arrays are read only views , only the simulator updates them.
+
+    Attributes:
+        remaining_work (np.ndarray): Total processing time of the operations still in the job queue.
+        remaining_ops (np.ndarray): Number of operations still in the job queue.
+        next_op (np.ndarray): op_id of the next operation of the job queue (the end of the job if empty).
+        next_process_time (np.ndarray): Processing time of the next operation of the job queue (0 if empty).
+        release_time (np.ndarray): Clock of the last completion of an operation of the job (0 if none).
+        waiting_time (np.ndarray): Elapsed time of the next operation in the job queue (0 if empty).
+    """
+    fields = ("remaining_work", "remaining_ops", "next_op", "next_process_time", "release_time")
+
+    def __init__(self, log, op_job, op_process_time, job_first_op, job_last_op):
+        """
+        Initialize the statistics.
+
+        Parameters:
+            log (EventLog): The event log of the simulator.
+            op_job, op_process_time (np.ndarray): Job and processing time of every operation , indexed by op_id.
+            job_first_op, job_last_op (np.ndarray): Range of the op_ids of every job.
+        """
+        self.log = log
+        self.op_job = op_job
+        self.op_process_time = np.append(op_process_time, 0)   # the end of a job reads 0
+        self.job_last_op = job_last_op
+
+        self.initial = np.zeros((len(self.fields), len(job_first_op)), dtype=np.int64)
+        self.initial[0] = np.bincount(op_job, weights=op_process_time, minlength=len(job_first_op)).astype(np.int64)
+        self.initial[1] = job_last_op - job_first_op
+        self.initial[2] = job_first_op
+        self.initial[3] = np.where(job_first_op < job_last_op, self.op_process_time[job_first_op], 0)
+
+        self.table = self.initial.copy()
+        for row, name in enumerate(self.fields):
+            view = self.table[row].view()
+            view.flags.writeable = False
+            setattr(self, name, view)
+
+    def reset(self):
+        """
+        Put all the operations back in their job queues.
+        """
+        self.table[...] = self.initial
+
+    def move(self, op_id, clock):
+        """
+        Update the statistics of the job of an operation after its move was logged.
+
+        Parameters:
+            op_id (int): Index of the operation.
+            clock (int): Current simulation clock.
+        """
+        stage = self.log.stage[op_id]
+        if stage == EventLog.READY:
+            job = self.op_job[op_id]
+            table = self.table
+            table[0, job] -= self.op_process_time[op_id]
+            table[1, job] -= 1
+            table[2, job] += 1
+            table[3, job] = self.op_process_time[table[2, job]] if table[2, job] < self.job_last_op[job] else 0
+        elif stage == EventLog.DELIVERY:
+            self.table[4, self.op_job[op_id]] = clock
+
+    @property
+    def waiting_time(self):
+        next_op = np.minimum(self.next_op, len(self.op_job) - 1)
+        return np.where(self.remaining_ops > 0, self.log.times[next_op, EventLog.JOB, 2], 0)
+
 class Token:
     """
     Class representing a token in a Petri net.
@@ -130,10 +308,11 @@ class Token:
         color (tuple): Tuple representing the color of the token (job_color, machine_color).
         features (list) : a list containing the features of the token feature [0] is reserved for processing time
         order (int): Order of  the operation in the job  .
+        op_id (int): Index of the operation in the event log.
         logging (dict): Dictionary for logging entry time, leave time, and elapsed time for each place.
     """
 
-    def __init__(self, initial_place, color=(None, None), features=[] ,order=0 , trans_time=0 ):
+    def __init__(self, initial_place, color=(None, None), features=[] ,order=0 , trans_time=0 , log=None, op_id=None):
         """
         Initialize a token.
 
@@ -145,6 +324,8 @@ class Token:
             transportation_time (int) : the time the operation take to move from  machine to another if not given = 0
             features (list) : a place holder for other features energy , cost , ...
             logging (dict) : a logging of every place the token went throught 
+            log (EventLog) : the event log of the simulator, if given the logging dict is a view built from it
+            op_id (int) : index of the operation in the event log
         """
         
         self.uid = IdGen.generate_uid()
@@ -153,7 +334,16 @@ class Token:
         self.trans_time=trans_time
         self.process_time = features[0]
         self.features=features[1:]
-        self.logging = {initial_place: [0, 0, 0]}  # entry time, leave time, elapsed time
+        self.log = log
+        self.op_id = op_id
+        if log is None:
+            self._logging = {initial_place: [0, 0, 0]}  # entry time, leave time, elapsed time
+
+    @property
+    def logging(self):
+        if self.log is None:
+            return self._logging
+        return self.log.logging(self)
    
 
     def __str__(self):
@@ -0,0 +1,216 @@
+import numpy as np
+
+
+class Decoder:
+    """
+    Semi-active schedule decoder working on flat operation arrays (op_id numbering of the simulators , job by job in order).
+
+    A schedule is given as an operation permutation with repetition : the job of every operation in dispatch order ,
+    the k-th occurrence of a job being its k-th operation. Every operation starts as soon as the previous operation
+    of its job is done and transported and the previous operation of its machine is done :
+        start = max(job_free + trans_time , machine_free) , end = start + process_time + lag , free = end + gap
+
+    This is the timing of the simulators when every enabled action is fired before the clock moves (no standby) :
+    lag = gap = 0 for the fms simulators , lag = gap = 1 for the mono and heuristic simulators (the completion is
+    logged one unit after the processing time and the clock ticks once more before the next decision).
+    The makespans are given in clock units of the simulators , i.e. the clock at termination : the simulators tick once
+    more after the last completion before they detect the terminal state , so the makespan is the last end + 1
+    (0 for an empty instance) and can be compared directly with sim.clock and the envs best_makespan.
+
+    Attributes:
+        n_jobs (int): The number of jobs.
+        n_machines (int): The number of machines.
+        n_ops (int): The number of operations.
+        op_job, op_machine, op_process_time, op_trans_time (np.ndarray): The operation arrays indexed by op_id.
+        job_first_op (np.ndarray): op_id of the first operation of every job.
+        sorted_jobs (np.ndarray): The sorted job occurrences , every valid permutation sorts to it.
+    """
+
+    def __init__(self, instance, trans_matrix=None, lag=0, gap=0):
+        """
+        Compile the operation arrays.
+
+        Parameters:
+            instance (Instance): The instance from load_instance.
+            trans_matrix (np.ndarray): The transport times from load_trans , no transport if None.
+            lag (int): Time units between the end of the processing time and the completion of an operation.
+            gap (int): Time units between the completion of an operation and the release of its machine and job.
+        """
+        valid = instance.valid
+        self.n_jobs, self.n_machines = len(instance), instance.n_machines
+        self.lag, self.gap = lag, gap
+
+        self.op_job = np.nonzero(valid)[0].astype(np.int64)
+        self.op_machine = instance.machines[valid].astype(np.int64)
+        self.op_process_time = instance.process_times[valid].astype(np.int64)
+        self.op_trans_time = instance.trans_times(trans_matrix)[valid]
+        self.n_ops = len(self.op_job)
+
+        self.job_first_op = np.cumsum(instance.n_ops) - instance.n_ops
+        self.sorted_jobs = np.sort(self.op_job)
+
+    @classmethod
+    def from_simulator(cls, sim, lag=0, gap=0):
+        """
+        Build the decoder of the instance and transport layout of a simulator.
+
+        Parameters:
+            sim: A simulator (Petri_build or Array_build).
+            lag (int): 0 for the fms simulators , 1 for the mono and heuristic simulators.
+            gap (int): 0 for the fms simulators , 1 for the mono and heuristic simulators.
+        """
+        return cls(sim.instance, sim.tran_durations, lag=lag, gap=gap)
+
+    def validate(self, sequences):
+        """
+        Check that every row is a permutation with repetition of the jobs.
+
+        Parameters:
+            sequences (np.ndarray): The job sequences (batch x n_ops).
+        """
+        if sequences.shape[-1] != self.n_ops or not (np.sort(sequences, axis=-1) == self.sorted_jobs).all():
+            raise ValueError(f"A sequence must hold every job once per operation ({self.n_ops} operations)")
+
+    def decode(self, sequence):
+        """
+        Decode one operation permutation.
+
+        Parameters:
+            sequence (array-like): Job of every operation in dispatch order.
+
+        Returns:
+            np.ndarray: Start time of every operation (indexed by op_id).
+            np.ndarray: End time of every operation (indexed by op_id).
+            int: The makespan in clock units (last end + 1).
+        """
+        sequence = np.asarray(sequence, dtype=np.int64)
+        self.validate(sequence)
+
+        job_next = self.job_first_op.tolist()
+        job_free = [0] * self.n_jobs
+        machine_free = [0] * self.n_machines
+        op_machine, op_time, op_trans = self.op_machine.tolist(), self.op_process_time.tolist(), self.op_trans_time.tolist()
+        start, end = [0] * self.n_ops, [0] * self.n_ops
+
+        for job in sequence.tolist():
+            op = job_next[job]
+            job_next[job] += 1
+            machine = op_machine[op]
+            start[op] = max(job_free[job] + op_trans[op], machine_free[machine])
+            end[op] = start[op] + op_time[op] + self.lag
+            job_free[job] = machine_free[machine] = end[op] + self.gap
+
+        return np.array(start, dtype=np.int64), np.array(end, dtype=np.int64), max(end, default=-1) + 1
+
+    def decode_batch(self, sequences):
+        """
+        Decode a batch of operation permutations at once , one vectorized step per operation position.
+
+        Parameters:
+            sequences (np.ndarray): Job of every operation in dispatch order for every candidate (batch x n_ops).
+
+        Returns:
+            np.ndarray: Start time of every operation (batch x n_ops , indexed by op_id).
+            np.ndarray: End time of every operation (batch x n_ops , indexed by op_id).
+            np.ndarray: The makespan of every candidate in clock units (last end + 1).
+        """
+        sequences = np.asarray(sequences, dtype=np.int64)
+        self.validate(sequences)
+
+        batch = len(sequences)
+        rows = np.arange(batch)
+        job_next = np.tile(self.job_first_op, (batch, 1))
+        job_free = np.zeros((batch, self.n_jobs), dtype=np.int64)
+        machine_free = np.zeros((batch, self.n_machines), dtype=np.int64)
+        start = np.zeros((batch, self.n_ops), dtype=np.int64)
+        end = np.zeros((batch, self.n_ops), dtype=np.int64)
+
+        for jobs in sequences.T:
+            ops = job_next[rows, jobs]
+            job_next[rows, jobs] += 1
+            machines = self.op_machine[ops]
+            begin = np.maximum(job_free[rows, jobs] + self.op_trans_time[ops], machine_free[rows, machines])
+            finish = begin + self.op_process_time[ops] + self.lag
+            start[rows, ops], end[rows, ops] = begin, finish
+            job_free[rows, jobs] = machine_free[rows, machines] = finish + self.gap
+
+        return start, end, end.max(axis=1, initial=-1) + 1
+
+    def from_machine_sequences(self, machine_sequences):
+        """
+        Convert per machine sequences into an operation permutation with the same semi-active schedule.
+
+        Parameters:
+            machine_sequences (list): The op_ids processed by every machine , in processing order.
+
+        Returns:
+            np.ndarray: Job of every operation in a dispatch order compatible with the job and machine orders.
+        """
+        machine_sequences = [list(ops) for ops in machine_sequences]
+        if sorted(op for ops in machine_sequences for op in ops) != list(range(self.n_ops)):
+            raise ValueError(f"The machine sequences must hold every operation once ({self.n_ops} operations)")
+
+        position = [0] * self.n_machines
+        job_next = self.job_first_op.tolist()
+        head = {ops[0]: machine for machine, ops in enumerate(machine_sequences) if ops}
+        ready = {op for op in head if op == job_next[self.op_job[op]]}
+        sequence = []
+
+        # dispatch the operations that are next in their job and on their machine
+        while ready:
+            op = ready.pop()
+            job, machine = int(self.op_job[op]), head.pop(op)
+            sequence.append(job)
+            job_next[job] += 1
+            position[machine] += 1
+            if position[machine] < len(machine_sequences[machine]):
+                successor = machine_sequences[machine][position[machine]]
+                head[successor] = machine
+                if successor == job_next[self.op_job[successor]]:
+                    ready.add(successor)
+            if job_next[job] in head and self.op_job[job_next[job]] == job:
+                ready.add(job_next[job])
+
+        if len(sequence) < self.n_ops:
+            raise ValueError("The machine sequences contradict the job orders (cyclic schedule)")
+        return np.array(sequence, dtype=np.int64)
+
+    def machine_sequences(self, start):
+        """
+        Get the per machine sequences of a schedule.
+
+        Parameters:
+            start (np.ndarray): Start time of every operation (indexed by op_id).
+
+        Returns:
+            list: The op_ids processed by every machine , in processing order.
+        """
+        order = np.argsort(start, kind="stable")
+        machines = self.op_machine[order]
+        return [order[machines == machine] for machine in range(self.n_machines)]
+
+    def permutation(self, start):
+        """
+        Get an operation permutation decoding to a semi-active schedule (the schedule itself if it is semi-active).
+
+        Parameters:
+            start (np.ndarray): Start time of every operation (indexed by op_id).
+
+        Returns:
+            np.ndarray: Job of every operation in start time order.
+        """
+        return self.op_job[np.argsort(start, kind="stable")]
+
+    def random_sequences(self, size, rng=None):
+        """
+        Draw uniform random operation permutations.
+
+        Parameters:
+            size (int): The number of permutations.
+            rng (np.random.Generator): The random generator.
+
+        Returns:
+            np.ndarray: The permutations (size x n_ops).
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        return rng.permuted(np.tile(self.op_job, (size, 1)), axis=1)
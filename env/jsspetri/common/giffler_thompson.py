@@ -0,0 +1,113 @@
+import numpy as np
+
+# "all" : every color compatible action , "active" / "non_delay" : Giffler-Thompson restrictions
+mask_modes = ("all", "active", "non_delay")
+
+
+def conflict_set(machines, start, end, mode="active", available=None):
+    """
+    Giffler-Thompson conflict set of the candidate operations (the next operation of every job).
+    In the active mode the critical machine is the machine of the candidate with the earliest completion , the
+    candidates of this machine that can start before this completion are kept. In the non-delay mode the critical
+    machine is the machine of the candidate with the earliest start , only its candidates with this start are kept.
+    The candidates of the other machines are left out.
+
+    The simulators decide in clock order : a machine whose conflict set has no available candidate (no enabled
+    action yet) is skipped for the next critical machine , so the other machines do not stay idle meanwhile.
+
+    Parameters:
+        machines (np.ndarray): Machine of every candidate operation.
+        start (np.ndarray): Earliest start time of every candidate operation.
+        end (np.ndarray): Earliest completion time of every candidate operation.
+        mode (str): "active" or "non_delay".
+        available (np.ndarray): True for the candidates with an enabled action , all of them if None.
+
+    Returns:
+        np.ndarray: True for the candidates in the conflict set.
+    """
+    if len(machines) == 0:
+        return np.zeros(0, dtype=bool)
+    available = np.ones(len(machines), dtype=bool) if available is None else available
+
+    order = np.argsort(end, kind="stable") if mode == "active" else np.lexsort((end, start))
+    skipped = np.zeros(len(machines), dtype=bool)
+    first = None
+    for critical in order:
+        if skipped[critical]:
+            continue
+        same_machine = machines == machines[critical]
+        kept = same_machine & (start < end[critical] if mode == "active" else start == start[critical])
+        kept[critical] = True   # a candidate without processing time still belongs to its own conflict set
+        if (kept & available).any():
+            return kept
+        first = kept if first is None else first
+        skipped |= same_machine
+
+    # nothing is available yet , the conflict set of the first critical machine
+    return first
+
+
+def candidates(sim, stage, times, next_op, queued, lag=0):
+    """
+    Earliest start and completion times of the next operation of every job : the operation in its ready place
+    (in transit or arrived) , else the head of its queue , released when the running operation of the job completes
+    and the transport is done. The operations and the job queues are read from flat arrays indexed by op_id.
+
+    Parameters:
+        sim: The simulator (clock , n_jobs , n_machines and the op_job , op_machine , op_process_time , op_trans_time arrays).
+        stage (np.ndarray): Current stage of every operation (job , ready , machine , delivery).
+        times (np.ndarray): Entry time , leave time and elapsed time of every operation in every stage (n_ops x 4 x 3).
+        next_op (np.ndarray): Head of every job queue.
+        queued (np.ndarray): True if the queue of the job is not empty.
+        lag (int): Time units between the end of the processing time and the release of the machine.
+
+    Returns:
+        tuple: Jobs , machines , earliest start and earliest completion of the candidates.
+    """
+    clock, n_ops = sim.clock, len(sim.op_job)
+
+    # machines and jobs are free when their running operation completes
+    running = np.flatnonzero(stage == 2)
+    remaining = np.maximum(sim.op_process_time[running] + lag - times[running, 2, 2], 0)
+    machine_free = np.full(sim.n_machines, clock, dtype=np.int64)
+    machine_free[sim.op_machine[running]] = clock + remaining
+    job_free = np.full(sim.n_jobs, clock, dtype=np.int64)
+    job_free[sim.op_job[running]] = clock + remaining
+
+    ops = np.where(queued, np.minimum(next_op, n_ops - 1), -1)
+    release = job_free + sim.op_trans_time[np.maximum(ops, 0)]
+
+    in_ready = np.flatnonzero(stage == 1)
+    ops[sim.op_job[in_ready]] = in_ready
+    release[sim.op_job[in_ready]] = clock + np.maximum(sim.op_trans_time[in_ready] - times[in_ready, 1, 2], 0)
+
+    jobs = np.flatnonzero(ops >= 0)
+    ops = ops[jobs]
+    machines = sim.op_machine[ops]
+    start = np.maximum(release[jobs], machine_free[machines])
+    return jobs, machines, start, start + sim.op_process_time[ops] + lag
+
+
+if __name__ == "__main__":
+
+    # the conflict sets must shrink the mask : mean number of enabled actions per decision in random episodes
+    from jsspetri.envs.fms.gym_env import FmsEnv
+    from jsspetri.envs.mono.gym_env import MonoEnv
+
+    def mean_mask(env, seed=0):
+        rng = np.random.default_rng(seed)
+        env.reset(seed=seed)
+        sizes, done = [], False
+        while not done:
+            mask = env.action_masks()
+            sizes.append(int(mask.sum()))
+            _, _, terminated, truncated, _ = env.step(rng.choice(np.flatnonzero(mask)))
+            done = terminated or truncated
+        return np.mean(sizes), env.sim.clock
+
+    for instance_id in ("ta01", "ta21"):
+        for name, make in (("fms", FmsEnv), ("mono", MonoEnv)):
+            sizes = {mode: mean_mask(make(instance_id, mask_mode=mode)) for mode in mask_modes}
+            print(f"{name} {instance_id}: " + " , ".join(f"{mode} {size:.2f} actions (makespan {clock})"
+                                                        for mode, (size, clock) in sizes.items()))
+            assert all(sizes[mode][0] < sizes["all"][0] for mode in ("active", "non_delay"))
@@ -1,5 +1,171 @@
 import os
-import pandas as pd
+import json
+import zlib
+import tempfile
+import numpy as np
+
+# all-pairs transport matrices of the layouts already loaded , keyed by their description
+layout_cache = {}
+
+
+def instance_path(benchmark, file_name):
+    """
+    Get the path of a file of the instances folder (portable).
+
+    Parameters:
+        benchmark (str): The benchmark folder.
+        file_name (str): The instance or transport layout file.
+
+    Returns:
+        str: The path of the file.
+    """
+    return os.path.join(os.path.dirname(__file__), "instances", benchmark, file_name)
+
+
+def load_matrix(path):
+    """
+    Load a whitespace separated file of integers into a matrix, rows shorter than the longest one are padded with -1.
+    The matrix is cached in a .npz file next to the source keyed by the checksum of the source, so repeat loads
+    read the cache instead of parsing the file again (no cache is written if the folder is read only).
+    The cache is written to a temporary file moved into place , a corrupt or partial cache is parsed again.
+
+    Parameters:
+        path (str): The path of the file.
+
+    Returns:
+        np.ndarray: The matrix (one row per line of the file).
+    """
+    with open(path, 'rb') as file:
+        content = file.read()
+    checksum = zlib.crc32(content)
+
+    cache_path = f"{path}.npz"
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cache:
+                if int(cache["checksum"]) == checksum:
+                    return cache["data"]
+        except Exception:
+            pass
+
+    rows = [line.split() for line in content.decode().splitlines()]
+    data = np.full((len(rows), max((len(row) for row in rows), default=0)), -1, dtype=np.int64)
+    for i, row in enumerate(rows):
+        data[i, :len(row)] = [int(float(element)) for element in row]
+
+    try:
+        descriptor, temp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(cache_path))
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                np.savez(file, checksum=np.int64(checksum), data=data)
+            os.replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    except OSError:
+        pass
+
+    return data
+
+
+def instance_checksum(instance_id, benchmark="Taillard"):
+    """
+    Get the checksum of an instance file , the key of the caches of results computed on the instance.
+
+    Returns:
+        int: The crc32 of the file content.
+    """
+    with open(instance_path(benchmark, instance_id), 'rb') as file:
+        return zlib.crc32(file.read())
+
+
+class Instance:
+    """
+    Columnar JSSP instance : the operations of every job are stored in padded (n_jobs x max_ops) arrays
+    in their processing order , operation k of job j is at [j, k].
+
+    Attributes:
+        n_jobs (int): The number of jobs.
+        n_machines (int): The number of machines.
+        n_features (int): The number of features of an operation (the processing time and the extra features).
+        max_bound (int): The maximum value found in the instance.
+        machines (np.ndarray): Machine of every operation (-1 for the padding).
+        process_times (np.ndarray): Processing time of every operation (0 for the padding).
+        features (np.ndarray): Extra features of every operation (n_jobs x max_ops x n_features-1 , 0 for the padding).
+        valid (np.ndarray): True for the operations of the instance , False for the padding.
+        n_ops (np.ndarray): Number of operations of every job.
+    """
+
+    def __init__(self, raw_instance, n_job, n_machine, n_features, max_bound):
+        """
+        Build the arrays from the raw instance.
+
+        Parameters:
+            raw_instance (np.ndarray): The raw instance data, one row per job (-1 for the missing cells).
+        """
+        self.n_jobs, self.n_machines, self.n_features, self.max_bound = n_job, n_machine, n_features, max_bound
+
+        rows = raw_instance[:n_job]
+        width = -(-rows.shape[1] // (n_features + 1)) * (n_features + 1)
+        padded = np.full((n_job, width), -1, dtype=np.int64)
+        padded[:, :rows.shape[1]] = rows
+        operations = padded.reshape(n_job, -1, n_features + 1)
+
+        # the operations are packed at the front of the rows in their order (stable sort of the missing ones to the back)
+        order = np.argsort(operations[:, :, 0] < 0, axis=1, kind="stable")
+        operations = np.take_along_axis(operations, order[:, :, None], axis=1)
+
+        self.valid = operations[:, :, 0] >= 0
+        self.machines = np.where(self.valid, operations[:, :, 0], -1)
+        self.process_times = np.where(self.valid, operations[:, :, 1], 0)
+        self.features = np.where(self.valid[:, :, None], operations[:, :, 2:], 0)
+        self.n_ops = self.valid.sum(axis=1)
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of jobs.
+        """
+        return self.n_jobs
+
+    def job_operations(self, job):
+        """
+        Get the operations of a job.
+
+        Parameters:
+            job (int): The job index.
+
+        Returns:
+            list: (machine, features) of every operation of the job in order, features[0] is the processing time.
+        """
+        n_ops = self.n_ops[job]
+        features = np.concatenate((self.process_times[job, :n_ops, None], self.features[job, :n_ops]), axis=1)
+        return list(zip(self.machines[job, :n_ops].tolist(), features.tolist()))
+
+    def trans_times(self, trans_matrix=None):
+        """
+        Precompute the transport time of every operation from the machine of the previous operation of its job.
+
+        Parameters:
+            trans_matrix (np.ndarray): Transport times indexed [origin][destination] , pairs outside the matrix take 0.
+                                       All the transport times are 0 if None.
+
+        Returns:
+            np.ndarray: Transport time of every operation (n_jobs x max_ops) , 0 for the first operation of a job,
+                        a repeated machine and the padding.
+        """
+        times = np.zeros(self.machines.shape, dtype=np.int64)
+        if trans_matrix is None:
+            return times
+
+        origin = np.full(self.machines.shape, -1, dtype=np.int64)
+        origin[:, 1:] = self.machines[:, :-1]
+        destination = self.machines
+        size = len(trans_matrix)
+        moving = self.valid & (origin >= 0) & (origin < size) & (destination < size) & (origin != destination)
+        times[moving] = trans_matrix[origin[moving], destination[moving]]
+        return times
+
 
 def load_instance_raw(instance_id,benchmark):
     """
@@ -9,42 +175,29 @@ def load_instance_raw(instance_id,benchmark):
         instance_id (str): The identifier of the instance to load.
 
     Returns:
-        pandas.DataFrame: The raw instance data.
+        np.ndarray: The raw instance data, one row per job (-1 for the missing cells).
         tuple: A tuple containing the number of jobs, number of machines, and number of features.
     """
-               
-    instance_path = f"{os.path.dirname(__file__)}\\instances\\{benchmark}\\{instance_id}"
-    data = []
-    try:
-        with open(instance_path, 'r') as file:
-            for line in file:
-                elements = line.strip().split()
-                data.append(elements)
-            print(f"Instance '{instance_id}' is loaded.")
-    except FileNotFoundError:
-        print(f"The file '{instance_path}' was not found.")
-    except Exception as e:
-        print(f"An error occurred: {str(e)}")
-    
-    raw_instance = pd.DataFrame(data)
-    n_job, n_machine = tuple(raw_instance.iloc[0].dropna().astype(int))
-    n_features = int((raw_instance.shape[1] - (n_machine * 2)) / n_machine) + 1
-    raw_instance = raw_instance.drop(0).apply(pd.to_numeric, errors='coerce')
-    
-    max_bound=raw_instance.max().max()
+    data = load_matrix(instance_path(benchmark, instance_id))
+
+    n_job, n_machine = (int(value) for value in data[0][data[0] >= 0][:2])
+    n_features = int((data.shape[1] - (n_machine * 2)) / n_machine) + 1
+    raw_instance = data[1:]
+
+    max_bound = int(raw_instance.max())
     return raw_instance, (n_job, n_machine, n_features,max_bound)
 
 def load_instance(instance_id,benchmark="Taillard"):
     
 
     """
-    Load instance data from a file and organize it into a structured format.
+    Load instance data from a file and organize it into a columnar format.
 
     Parameters:
         instance_id (str): The identifier of the instance to load.
 
     Returns:
-        list: A list containing dictionaries representing the operation sequence for each job.
+        Instance: The operations of every job in padded (n_jobs x max_ops) arrays.
         tuple: A tuple containing the number of jobs, number of machines, and number of features.
     """
     
@@ -52,19 +205,7 @@ def load_instance(instance_id,benchmark="Taillard"):
         raise ValueError("Benchmark must be one of: 'Taillard', 'Taillard_random', 'Demirkol'")
     
     raw_instance, (n_job, n_machine, n_features, max_bound) = load_instance_raw(instance_id, benchmark)
-    instance = []
-
-    for job_index in range(n_job):
-       job = {}
-
-       for op_index in range(0, raw_instance.shape[1], n_features + 1):
-           key = raw_instance.iloc[job_index, op_index]
-
-           if not pd.isna(key):
-               values = list(raw_instance.iloc[job_index, op_index + 1: op_index + n_features + 1])
-               job[int (key)] = values
-
-       instance.append(job)
+    instance = Instance(raw_instance, n_job, n_machine, n_features, max_bound)
 
     return instance, (n_job, n_machine, n_features, max_bound)
 
@@ -74,41 +215,143 @@ def load_trans(n_machine,benchmark="Taillard", trans_layout = None):
     
 
     """
-    Load transport time  data from a file .
+    Load transport time  data from a file , or from a layout description (see load_layout).
 
     Parameters:
-        instance_id (str): The identifier of the instance to load.
+        n_machine (int): The number of machines, selects the default layout trans_{n_machine}.
+        trans_layout: The transport layout file, a .json layout file or a layout dict , the default layout is used if None.
 
     Returns:
-        list: A list containing dictionaries representing the operation sequence for each job.
-        tuple: A tuple containing the number of jobs, number of machines, and number of features.
+        np.ndarray: The transport times indexed [origin][destination] (the origins are the columns of the file),
+                    all zero if the benchmark has no default layout.
+
+    Raises:
+        ValueError: If the layout is not a complete matrix covering the n_machine machines.
     """
     
     if benchmark not in ["Taillard", "Taillard_random", "Demirkol","BU","Raj"]:
         raise ValueError("Benchmark must be one of: 'Taillard', 'Taillard_random', 'Demirkol', 'BU', 'Raj'")
 
+    if isinstance(trans_layout, dict) or (isinstance(trans_layout, str) and trans_layout.endswith(".json")):
+        return check_size(load_layout(trans_layout, benchmark=benchmark), n_machine, "layout")
+
     if trans_layout is not None and trans_layout != '':
-        instance_path = f"{os.path.dirname(__file__)}\\instances\\{benchmark}\\{trans_layout}"
+        path = instance_path(benchmark, trans_layout)
     else:
-        instance_path = f"{os.path.dirname(__file__)}\\instances\\{benchmark}\\trans_{n_machine}"
-    trans_matrix=None
-    
-    data=[]
+        path = instance_path(benchmark, f"trans_{n_machine}")
+        if not os.path.exists(path):
+            return np.zeros((n_machine, n_machine), dtype=np.int64)
+
     try:
-        with open(instance_path, 'r') as file:
-            for line in file:
-                elements = line.strip().split()
-                data.append(elements)
-          
+        trans_matrix = load_matrix(path).T
     except FileNotFoundError:
-        print(f"The file '{instance_path}' was not found.")
-    except Exception as e:
-        print(f"An error occurred: {str(e)}")
-        
-    trans_matrix = pd.DataFrame(data)   
-    
-    
-   
+        print(f"The file '{path}' was not found.")
+        trans_matrix = np.zeros((n_machine, n_machine), dtype=np.int64)
+
+    return check_size(validate_trans(trans_matrix, path), n_machine, path)
+
+
+def check_size(trans_matrix, n_machine, name=""):
+    """
+    Check that a transport matrix covers every machine of the instance.
+
+    Returns:
+        np.ndarray: The matrix.
+    """
+    if len(trans_matrix) < n_machine:
+        raise ValueError(f"The transport layout '{name}' has {len(trans_matrix)} stations for {n_machine} machines")
+    return trans_matrix
+
+
+def validate_trans(trans_matrix, name=""):
+    """
+    Check that a transport matrix is a complete square matrix of non negative integers.
+
+    Parameters:
+        trans_matrix (np.ndarray): The transport matrix.
+        name (str): The name of the layout, for the error message.
+
+    Returns:
+        np.ndarray: The matrix as a read only int64 array.
+    """
+    trans_matrix = np.array(trans_matrix, dtype=np.int64)
+    if trans_matrix.ndim != 2 or trans_matrix.shape[0] != trans_matrix.shape[1]:
+        raise ValueError(f"The transport layout '{name}' must be a square matrix, got shape {trans_matrix.shape}")
+    if (trans_matrix < 0).any():
+        raise ValueError(f"The transport layout '{name}' has missing or negative transport times")
+
+    trans_matrix.flags.writeable = False
+    return trans_matrix
+
+
+def load_layout(layout, benchmark="Taillard"):
+    """
+    Build the all-pairs transport matrix of a layout description , the matrices are cached per layout.
+
+    The layout (a dict , or the name of a .json file of the benchmark folder) describes the stations with:
+        "coordinates": [[x, y], ...] position of every station (one per machine, in machine order),
+        "edges": [[u, v], ...] or [[u, v, time], ...] aisles of the graph between the nodes (optional),
+        "stations": node of every machine in the graph (optional , the first nodes by default),
+        "metric": "manhattan" (default) or "euclidean" distance between coordinates,
+        "speed": distance units traveled per time unit (default 1),
+        "directed": True if the aisles are one way (default False).
+    Without edges the stations are directly connected , with edges the transport time between two stations
+    is the shortest path through the aisle graph (edges without time take the distance between their nodes).
+
+    Parameters:
+        layout: The layout dict or .json file name.
+
+    Returns:
+        np.ndarray: The transport times indexed [origin][destination] (rounded up to integers).
+    """
+    if isinstance(layout, str):
+        with open(instance_path(benchmark, layout), 'r') as file:
+            layout = json.load(file)
+
+    key = json.dumps(layout, sort_keys=True)
+    if key in layout_cache:
+        return layout_cache[key]
+
+    coordinates = np.array(layout.get("coordinates", []), dtype=np.float64).reshape(-1, 2)
+    edges = layout.get("edges")
+    speed = layout.get("speed", 1)
+
+    def distance(origin, destination):
+        delta = np.abs(coordinates[origin] - coordinates[destination])
+        if layout.get("metric", "manhattan") == "euclidean":
+            return np.sqrt((delta ** 2).sum(axis=-1))
+        return delta.sum(axis=-1)
+
+    if edges is None:
+        nodes = np.arange(len(coordinates))
+        times = distance(nodes[:, None], nodes[None, :])
+        stations = nodes
+    else:
+        n_nodes = max(len(coordinates), 1 + max(max(edge[0], edge[1]) for edge in edges))
+        times = np.full((n_nodes, n_nodes), np.inf)
+        np.fill_diagonal(times, 0)
+        for edge in edges:
+            origin, destination = edge[0], edge[1]
+            time = edge[2] if len(edge) > 2 else distance(origin, destination)
+            times[origin, destination] = min(times[origin, destination], time)
+            if not layout.get("directed", False):
+                times[destination, origin] = min(times[destination, origin], time)
+
+        # Floyd-Warshall shortest paths , one vectorized relaxation per intermediate node
+        for node in range(n_nodes):
+            np.minimum(times, times[:, node, None] + times[None, node, :], out=times)
+
+        if "stations" not in layout and len(coordinates) == 0:
+            raise ValueError("A layout without coordinates must give the node of every machine in 'stations'")
+        stations = np.array(layout.get("stations", range(len(coordinates))), dtype=np.int64)
+        if ((stations < 0) | (stations >= n_nodes)).any():
+            raise ValueError(f"The stations of the layout must be nodes of the aisle graph (0 to {n_nodes - 1})")
+        if np.isinf(times[np.ix_(stations, stations)]).any():
+            raise ValueError("The aisle graph of the layout does not connect all the stations")
+
+    trans_matrix = np.ceil(times[np.ix_(stations, stations)] / speed - 1e-9)
+    trans_matrix = validate_trans(trans_matrix, layout.get("name", "layout"))
+    layout_cache[key] = trans_matrix
     return trans_matrix
 
 # %% Test
@@ -125,16 +368,3 @@ if __name__ == "__main__":
      n_job, n_machine, n_features ,max_bound=size
 
      print(instance)
-
-     
-     
-     
-     
-     
-     
-   
-    
-
-
-
-
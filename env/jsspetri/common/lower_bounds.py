@@ -0,0 +1,189 @@
+import numpy as np
+
+JOB, READY, MACHINE, DELIVERY = 0, 1, 2, 3
+
+
+class LowerBounds:
+    """
+    Lower bounds on the remaining makespan (time from the current clock to the last completion) , maintained on every
+    move of an operation (O(n_machines) per move) from the stage and times arrays of the simulator (EventLog or array logging).
+
+    Every operation still in its job queue needs its transport and its processing time , the operation in transit
+    needs the rest of its transport and the running operations the rest of their processing time :
+        job bound : the longest remaining route of a job.
+        machine bound : the longest remaining load of a machine.
+        one-machine bound : for every machine , the earliest arrival of its remaining operations (head) , its load
+                            and the shortest remaining route after them (tail) , relaxing the other machines.
+
+    move() keeps the shortest tail of every machine (a pointer in the operations of the machine sorted by tail) and the
+    earliest head of every job on every machine , as an offset from the end of the current operation of the job. The
+    heads move with the clock through the rest of the current operations , so one_machine_bound() takes the minimum
+    over the jobs : O(n_jobs x n_machines) per call , without scanning the operations.
+
+    Attributes:
+        job_table (np.ndarray): Remaining route of the job queue , next queued op_id , current op_id
+                                (in transit or running , -1 if none) and head offset on every machine of every job
+                                ((3 + n_machines) x n_jobs).
+        machine_table (np.ndarray): Remaining load , running op_id (-1 if none) and position of the shortest tail
+                                    of the waiting operations in tail_order of every machine (3 x n_machines).
+    """
+
+    def __init__(self, stage, times, op_job, op_machine, op_process_time, op_trans_time, job_first_op, n_machines):
+        """
+        Initialize the bounds.
+
+        Parameters:
+            stage (np.ndarray): Current stage of every operation (updated in place by the simulator).
+            times (np.ndarray): Entry , leave and elapsed time of every operation in every stage (n_ops x 4 x 3).
+            op_job, op_machine, op_process_time, op_trans_time (np.ndarray): The operation arrays , indexed by op_id.
+            job_first_op (np.ndarray): op_id of the first operation of every job.
+            n_machines (int): The number of machines.
+        """
+        self.stage, self.times = stage, times
+        self.op_job, self.op_machine = op_job, op_machine
+        self.op_process_time, self.op_trans_time = op_process_time, op_trans_time
+        n_jobs = len(job_first_op)
+
+        # route of every operation (transport and processing) , the sums before it and after it in its job
+        # (before is indexed up to n_ops , the next op_id of an empty queue)
+        work = op_process_time + op_trans_time
+        self.before = np.concatenate(([0], np.cumsum(work))).astype(work.dtype)
+        job_end = np.bincount(op_job, weights=work, minlength=n_jobs) + self.before[job_first_op]
+        self.tail = job_end[op_job] - self.before[:-1] - work
+        self.work = work
+        self.job_last_op = np.append(job_first_op[1:], len(op_job)).astype(np.int64)
+
+        # arrival of the first operation on every machine from every operation on , in the route of its job
+        # (far if the job has no such operation left) , and the operations of every machine sorted by tail
+        n_ops = len(op_job)
+        self.far = 2 * int(work.sum()) + 1
+        self.first_arrival = np.full((n_ops + 1, n_machines), self.far, dtype=work.dtype)
+        for op in range(n_ops - 1, -1, -1):
+            if op + 1 < self.job_last_op[op_job[op]]:
+                self.first_arrival[op] = self.first_arrival[op + 1]
+            self.first_arrival[op, op_machine[op]] = self.before[op] + op_trans_time[op]
+        self.tail_order = np.lexsort((self.tail, op_machine))
+        self.sorted_tail = np.append(self.tail[self.tail_order], self.far)
+        self.machine_last = np.cumsum(np.bincount(op_machine, minlength=n_machines))
+
+        self.initial_jobs = np.zeros((3 + n_machines, n_jobs), dtype=work.dtype)
+        self.initial_jobs[0] = np.bincount(op_job, weights=work, minlength=n_jobs)
+        self.initial_jobs[1] = job_first_op
+        self.initial_jobs[2] = -1
+        self.initial_jobs[3:] = self.offsets(job_first_op, np.arange(n_jobs)).T
+        self.initial_machines = np.zeros((3, n_machines), dtype=work.dtype)
+        self.initial_machines[0] = np.bincount(op_machine, weights=op_process_time, minlength=n_machines)
+        self.initial_machines[1] = -1
+        self.initial_machines[2] = self.machine_last - np.bincount(op_machine, minlength=n_machines)
+
+        self.job_table = self.initial_jobs.copy()
+        self.machine_table = self.initial_machines.copy()
+        self.head_offset = self.job_table[3:]
+
+    def offsets(self, next_ops, jobs):
+        """
+        Returns:
+            np.ndarray: The arrival of the first queued operation of jobs on every machine , from the end of their
+                        current operation (len(jobs) x n_machines , far if none).
+        """
+        next_ops = np.asarray(next_ops, dtype=np.int64)
+        arrival = self.first_arrival[next_ops]
+        queued = (next_ops < self.job_last_op[jobs])[:, None] & (arrival < self.far)
+        return np.where(queued, arrival - self.before[next_ops][:, None], self.far)
+
+    def reset(self):
+        """
+        Put all the operations back in their job queues.
+        """
+        self.job_table[...] = self.initial_jobs
+        self.machine_table[...] = self.initial_machines
+
+    def move(self, ops):
+        """
+        Update the bounds after the move of operations was logged.
+
+        Parameters:
+            ops: Index (or indices) of the operations , all in the same stage.
+        """
+        ops = np.atleast_1d(ops)
+        if len(ops) == 0:
+            return
+        stage = self.stage[ops[0]]
+        jobs, machines = self.op_job[ops], self.op_machine[ops]
+        if stage == READY:
+            np.subtract.at(self.job_table[0], jobs, self.work[ops])
+            np.add.at(self.job_table[1], jobs, 1)
+            self.job_table[2, jobs] = ops
+            self.head_offset[:, jobs] = self.offsets(self.job_table[1, jobs], jobs).T
+            self.head_offset[machines, jobs] = -self.op_process_time[ops]   # the rest of the transport
+        elif stage == MACHINE:
+            np.subtract.at(self.machine_table[0], machines, self.op_process_time[ops])
+            self.machine_table[1, machines] = ops
+            self.head_offset[machines, jobs] = self.offsets(self.job_table[1, jobs], jobs)[np.arange(len(ops)), machines]
+            for machine in np.unique(machines):
+                position, last = int(self.machine_table[2, machine]), self.machine_last[machine]
+                while position < last and self.stage[self.tail_order[position]] >= MACHINE:
+                    position += 1
+                self.machine_table[2, machine] = position
+        elif stage == DELIVERY:
+            self.job_table[2, jobs] = -1
+            self.machine_table[1, machines] = -1
+
+    def remaining(self, ops):
+        """
+        Returns:
+            np.ndarray: The remaining transport and processing time of operations in transit or running (0 for -1).
+        """
+        ops = ops.astype(np.int64)
+        current = np.maximum(ops, 0)
+        stage, elapsed = self.stage[current], self.times[current, self.stage[current], 2]
+        in_transit = np.maximum(self.op_trans_time[current] - elapsed, 0) + self.op_process_time[current]
+        running = np.maximum(self.op_process_time[current] - elapsed, 0)
+        return np.where(ops < 0, 0, np.where(stage == READY, in_transit, np.where(stage == MACHINE, running, 0)))
+
+    def job_bound(self):
+        """
+        Returns:
+            float: The longest remaining route of a job.
+        """
+        return float((self.remaining(self.job_table[2]) + self.job_table[0]).max(initial=0))
+
+    def machine_bound(self):
+        """
+        Returns:
+            float: The longest remaining load of a machine (with the rest of its running operation).
+        """
+        return float((self.remaining(self.machine_table[1]) + self.machine_table[0]).max(initial=0))
+
+    def one_machine_bound(self):
+        """
+        Returns:
+            float: The longest one-machine relaxation , earliest head + load + shortest tail of the operations
+                   not started yet on every machine (O(n_jobs x n_machines)).
+        """
+        position = self.machine_table[2].astype(np.int64)
+        loaded = position < self.machine_last
+        if not loaded.any():
+            return 0.0
+
+        first_head = (self.remaining(self.job_table[2]) + self.head_offset).min(axis=1)
+        last_tail = self.sorted_tail[np.where(loaded, position, -1)]
+        machine_free = self.remaining(self.machine_table[1])
+        bounds = np.maximum(machine_free, first_head) + self.machine_table[0] + last_tail
+        return float(bounds[loaded].max())
+
+    def bounds(self):
+        """
+        Returns:
+            dict: The job , machine and one-machine bounds and the best of them ("bound").
+        """
+        values = {"job": self.job_bound(), "machine": self.machine_bound(), "one_machine": self.one_machine_bound()}
+        values["bound"] = max(values.values())
+        return values
+
+    def bound(self):
+        """
+        Returns:
+            float: The best lower bound on the remaining makespan.
+        """
+        return max(self.job_bound(), self.machine_bound(), self.one_machine_bound())
@@ -1,6 +1,13 @@
 import copy 
+import numpy as np
 from jsspetri.common.instance_loader import load_instance ,load_trans
-from jsspetri.common.build_blocks import Token, Place, Transition
+from collections import OrderedDict
+from jsspetri.common.build_blocks import Token, Place, PlaceMarking, Transition, EventLog, JobStats
+from jsspetri.common.lower_bounds import LowerBounds
+
+# shared (places, transitions) of the (n_jobs, n_machines, standby, trans) shapes built last , least recently used first
+topologies = OrderedDict()
+max_topologies = 16
 
 
 class Petri_build:
@@ -8,14 +15,31 @@ class Petri_build:
     A class representing a Petri net for Job Shop Scheduling Problems (JSSP).
     Attributes:
         instance_id (str): The ID of the JSSP instance.
-        instance (pd.DataFrame): The JSSP instance data.
+        instance (Instance): The JSSP instance data (columnar).
         n_jobs (int): The number of jobs in the instance.
         n_machines (int): The number of machines in the instance.
         max_bound (int): The maximum number of operations or tokens.
-
-        places (dict): A dictionary containing Place objects.
-        transitions (dict): A dictionary containing Transition objects.
+        tran_durations (np.ndarray): Transport times between machines indexed [origin][destination] (None without transport).
+        trans_times (np.ndarray): Transport time of every operation from the machine of the previous one (n_jobs x max_ops).
+        op_job, op_machine, op_process_time, op_trans_time (np.ndarray): Job, machine, processing and transport time
+                                                                         of every operation , indexed by op_id.
+        job_first_op, job_last_op (np.ndarray): Range of the op_ids of every job.
+
+        places (dict): A dictionary containing Place objects (shared by the nets of the same shape , read only).
+        transitions (dict): A dictionary containing Transition objects (shared by the nets of the same shape , read only).
+        marking (dict): The PlaceMarking (tokens and busy flag) of every place of this net , by uid.
+        event_log (EventLog): Preallocated log of the operations going through the net.
+        job_stats (JobStats): Per job statistics (remaining work, next operation, ...) updated with the event log.
+        lower_bounds (LowerBounds): Lower bounds on the remaining makespan updated with the event log.
+        completion_log (list): Append-only (clock, token) record of every finished operation, in completion order.
+        initial_marking (list): Snapshot of the marking after the tokens are added, restored on reset.
+        jobs, select, ready, allocate, machines, deliver, delivery (list): Nodes of every role, cached once the net is built.
+        mask (np.ndarray): Persistent action mask , n_selects select actions (fms) , n_machines x n_jobs allocate actions
+                           and the standby action (see init_mask).
+        requested_machine (np.ndarray): Machine requested by the token of every job waiting for its allocation (-1 if none).
+        state_attributes (tuple): Dynamic attributes of the simulators copied by fork , on top of the marking and the event log.
     """
+    state_attributes = ("clock", "interaction_counter", "completion_log", "mask", "requested_machine")
 
     def __init__(self, instance_id,
                  benchmark = "Taillard",
@@ -39,18 +63,29 @@ class Petri_build:
         self.instance, specs = load_instance(instance_id = self.instance_id, benchmark = self.benchmark)
         self.n_jobs, self.n_machines, self.n_features,self.max_bound = specs
         
+        self.tran_durations = None
         if self.trans :  
             self.tran_durations = load_trans(self.n_machines,
                                              benchmark = self.benchmark,
                                              trans_layout = self.trans_layout)
+        # transport time of every operation of every job , precomputed from the route of the job
+        self.trans_times = self.instance.trans_times(self.tran_durations)
            
 
         self.places = {}
         self.transitions = {}
+        self.marking = {}
+        self.node_roles = None
+        self.event_log = None
+        self.job_stats = None
+        self.lower_bounds = None
+        self.completion_log = []
+        self.initial_marking = None
         
         if  self.dynamic : 
             self.n_jobs,self.n_machines=max_size
           
+        self.compile_operations()
         self.create_petri()
             
     def __str__(self):
@@ -61,6 +96,23 @@ class Petri_build:
         """
         return f"JSSP {self.instance_id}: {self.n_jobs} jobs X {self.n_machines} machines"
 
+    def compile_operations(self):
+        """
+        Compile the instance into flat operation arrays indexed by the op_id of the tokens (job by job , in order),
+        used to read the state of the net from the event log without walking the places.
+        """
+        valid = self.instance.valid
+        self.op_job = np.nonzero(valid)[0].astype(np.int64)
+        self.op_machine = self.instance.machines[valid]
+        self.op_process_time = self.instance.process_times[valid]
+        self.op_trans_time = self.trans_times[valid]
+
+        # the reserve jobs of the dynamic variant are empty
+        job_n_ops = np.zeros(self.n_jobs, dtype=np.int64)
+        job_n_ops[:len(self.instance)] = self.instance.n_ops
+        self.job_last_op = np.cumsum(job_n_ops)
+        self.job_first_op = self.job_last_op - job_n_ops
+
     def add_nodes_layer(self, is_place=True, node_type="", number=1):
         """
         Add a layer of nodes (places or transitions) to the Petri net.
@@ -70,6 +122,7 @@ class Petri_build:
             node_type (str): The type of nodes to be added.
             number (int): The number of nodes to be added.
         """
+        self.node_roles = None
         if is_place:
             for i in range(number):
                 place_name = f"{node_type} {i}"
@@ -111,61 +164,256 @@ class Petri_build:
     def add_tokens(self):
         """
         Add tokens to the Petri net.
-        Tokens represent job operations .
+        Tokens represent job operations , their times are logged in the event log (reset here with the job statistics
+        and the lower bounds).
         """
 
-        def cal_time(origin,destintion):
-
-            if origin is not destintion : # change of machine
-                try :
-                    trans_time=int (self.tran_durations[origin][destintion])
-                except :
-                    trans_time=0
-            return trans_time
-
-
+        if self.event_log is None:
+            n_ops = int(self.instance.n_ops.sum())
+            stage_uids = [self.filter_nodes(node_type) for node_type in ("job", "ready", "machine", "finished_ops")]
+            self.event_log = EventLog(n_ops, stage_uids)
+            self.job_stats = JobStats(self.event_log, self.op_job, self.op_process_time, self.job_first_op, self.job_last_op)
+            self.lower_bounds = LowerBounds(self.event_log.stage, self.event_log.times, self.op_job, self.op_machine,
+                                            self.op_process_time, self.op_trans_time, self.job_first_op, self.n_machines)
+        self.event_log.reset()
+        self.job_stats.reset()
+        self.lower_bounds.reset()
+
+        op_id = 0
         for job, uid in enumerate(self.filter_nodes("job")):
-            current_machine=None
-            try : # only add token to the operation in the instance  (for dynamic variant )
-                for i,(machine,features) in enumerate (self.instance[job].items()) :
-
-                    trans_time= cal_time(origin=current_machine,destintion=machine)
-
-                    self.places[uid].token_container.append( Token(initial_place=uid, color=(job, machine),
+            # only add token to the operation in the instance , the reserve jobs of the dynamic variant are empty
+            if job < len(self.instance):
+                for i,(machine,features) in enumerate (self.instance.job_operations(job)) :
+                    self.marking[uid].token_container.append( Token(initial_place=uid, color=(job, machine),
                                                                    features=features ,
                                                                    order=i ,
-                                                                   trans_time= trans_time ))
-                    current_machine = copy.copy(machine)
-
-            except :
-                pass # the reserve jobs are empty
+                                                                   trans_time= int(self.trans_times[job, i]) ,
+                                                                   log=self.event_log ,
+                                                                   op_id=op_id ))
+                    op_id += 1
 
     
     
     def filter_nodes(self, node_type):
         """
         Filters nodes based on node type.
+        The uids of every type are grouped once and cached, the topology does not change after create_petri.
         Parameters:
             node_type (str): Type of nodes to filter.
 
         Returns:
             list: Filtered nodes.
         """
-        filtered_nodes = []
-        for place in self.places.values():
-            if place.type == node_type:
-                filtered_nodes.append(place.uid)
+        if self.node_roles is None:
+            self.node_roles = {}
+            for place in self.places.values():
+                self.node_roles.setdefault(place.type, []).append(place.uid)
+
+            for transition in self.transitions.values():
+                self.node_roles.setdefault(transition.type, []).append(transition.uid)
+
+        return self.node_roles.get(node_type, [])
+
+    def role_nodes(self, node_type):
+        """
+        Get the nodes of a type.
+        Parameters:
+            node_type (str): Type of nodes to get.
+
+        Returns:
+            list: Place markings or transitions of the type, in creation order.
+        """
+        return [self.marking[uid] if uid in self.marking else self.transitions[uid] for uid in self.filter_nodes(node_type)]
+
+    def cache_roles(self):
+        """
+        Cache the lists of nodes of every role used by the simulators.
+        """
+        self.jobs = self.role_nodes("job")
+        self.select = self.role_nodes("select")
+        self.ready = self.role_nodes("ready")
+        self.allocate = self.role_nodes("allocate")
+        self.machines = self.role_nodes("machine")
+        self.deliver = self.role_nodes("finish_op")
+        self.delivery = self.role_nodes("finished_ops")
+
+    def init_mask(self, n_selects=0, standby=False):
+        """
+        Allocate the persistent action mask.
+        Parameters:
+            n_selects (int): Number of select actions before the allocate actions (n_jobs in the fms simulators).
+            standby (bool): True if the last action is the standby.
+        """
+        self.n_selects = n_selects
+        self.mask = np.zeros(n_selects + self.n_jobs * self.n_machines + int(standby), dtype=bool)
+        self.requested_machine = np.full(self.n_jobs, -1)
+
+    def decode_action(self, action):
+        """
+        Decodes a discrete action arithmetically, same layout as action_mapping.
+
+        Parameters:
+            action (int): Discrete action index.
+
+        Returns:
+            tuple: (job, ready) for a select , (job, machine) for an allocate , (None, None) for the standby.
+        """
+        action = int(action)
+        if action < self.n_selects:
+            return action, action
+        job_machine = action - self.n_selects
+        if job_machine == self.n_jobs * self.n_machines:
+            return None, None
+        return job_machine % self.n_jobs, job_machine // self.n_jobs
+
+    def job_request(self, job):
+        """
+        Returns:
+            int: Machine requested by the token of the job waiting for its allocation , the next operation
+                 of an idle job (-1 if none).
+        """
+        place = self.jobs[job]
+        return place.token_container[0].color[1] if place.token_container and not place.busy else -1
+
+    def reset_mask(self):
+        """
+        Rebuilds the persistent action mask from the current marking.
+        """
+        self.mask[:] = False
+        self.requested_machine[:] = -1
+        for job in range(self.n_jobs):
+            self.update_mask(job=job)
+        for machine in range(self.n_machines):
+            self.update_mask(machine=machine)
+        if len(self.mask) > self.n_selects + self.n_jobs * self.n_machines:
+            self.mask[-1] = True
+        self.restrict_mask()
+
+    def restrict_mask(self):
+        """
+        Restricts the mask after every update (mask modes of the simulators , nothing by default).
+        """
+
+    def update_mask(self, job=None, machine=None):
+        """
+        Updates the allocate entries of the action mask touched by a job and/or a machine.
+        An allocate is enabled if the job requests the machine (see job_request) while the machine is idle.
+
+        Parameters:
+            job (int): Index of the job whose places changed.
+            machine (int): Index of the machine whose place changed.
+        """
+        n_jobs, offset = self.n_jobs, self.n_selects
+        if job is not None:
+            previous = self.requested_machine[job]
+            if previous >= 0:
+                self.mask[offset + previous * n_jobs + job] = False
+
+            requested = self.job_request(job)
+            self.requested_machine[job] = requested
+            if requested >= 0:
+                self.mask[offset + requested * n_jobs + job] = not self.machines[requested].busy
+
+        if machine is not None:
+            start = offset + machine * n_jobs
+            self.mask[start:start + n_jobs] = (self.requested_machine == machine) & (not self.machines[machine].busy)
+
+    def snapshot_marking(self):
+        """
+        Take a snapshot of the marking.
+        Returns:
+            list: (place, tokens) of every place holding tokens.
+        """
+        return [(place, tuple(place.token_container)) for place in self.marking.values() if place.token_container]
+
+    def restore_marking(self, marking):
+        """
+        Restore a marking taken by snapshot_marking, the operations go back to their first stage in the event log,
+        the job statistics and the lower bounds.
+        Parameters:
+            marking (list): (place, tokens) of every place holding tokens.
+        """
+        for place in self.marking.values():
+            place.token_container.clear()
+            place.busy = False   # an episode can be reset before its end (e.g. truncated)
+        for place, tokens in marking:
+            place.token_container.extend(tokens)
+        self.event_log.reset()
+        self.job_stats.reset()
+        self.lower_bounds.reset()
+
+    def delivered_tokens(self, clock=None):
+        """
+        Reconstruct the delivery state from the completion log.
+        Parameters:
+            clock (int): Clock value of the state , the last one if None.
 
-        for transition in self.transitions.values():
-            if transition.type == node_type:
-                filtered_nodes.append(transition.uid)
+        Returns:
+            list: Tokens finished at or before the clock, in completion order.
+        """
+        return [token for finish, token in self.completion_log if clock is None or finish <= clock]
 
-        return filtered_nodes
+    def fork(self):
+        """
+        Copy the dynamic state of the simulation, the topology, the instance data and the tokens are shared.
+        Returns:
+            dict: State to pass to restore.
+        """
+        state = {name: copy.copy(getattr(self, name)) for name in self.state_attributes}
+        state["marking"] = self.snapshot_marking()
+        state["busy"] = [place.busy for place in self.marking.values()]
+        state["event_log"] = (self.event_log.times.copy(), self.event_log.stage.copy())
+        state["job_stats"] = self.job_stats.table.copy()
+        state["lower_bounds"] = (self.lower_bounds.job_table.copy(), self.lower_bounds.machine_table.copy())
+        return state
+
+    def restore(self, state):
+        """
+        Restore a state taken by fork (the state can be restored several times).
+        Parameters:
+            state (dict): State returned by fork.
+        """
+        for name in self.state_attributes:
+            value = state[name]
+            if isinstance(value, np.ndarray):
+                getattr(self, name)[...] = value   # in place , the masks are handed out by reference
+            else:
+                setattr(self, name, copy.copy(value))
+        self.restore_marking(state["marking"])
+        for place, busy in zip(self.marking.values(), state["busy"]):
+            place.busy = busy
+        self.event_log.times[...], self.event_log.stage[...] = state["event_log"]
+        self.job_stats.table[...] = state["job_stats"]
+        self.lower_bounds.job_table[...], self.lower_bounds.machine_table[...] = state["lower_bounds"]
     
     
 
     def create_petri(self):
-        """Create the Petri net structure, adding nodes, connections, and tokens."""
+        """
+        Create the Petri net structure, adding nodes, connections, and tokens.
+        The nodes and arcs are built once per shape and shared (read only) by all the nets of that shape ,
+        every net only gets its own marking of the places.
+        """
+        key = (self.n_jobs, self.n_machines, self.standby, self.trans)
+        if key in topologies:
+            topologies.move_to_end(key)
+        else:
+            self.build_topology()
+            topologies[key] = (self.places, self.transitions)
+            if len(topologies) > max_topologies:
+                topologies.popitem(last=False)
+
+        self.places, self.transitions = topologies[key]
+        self.marking = {uid: PlaceMarking(place) for uid, place in self.places.items()}
+        self.node_roles = None
+
+        # Add jobs tokens , once : resets restore this initial marking
+        self.add_tokens()
+        self.initial_marking = self.snapshot_marking()
+        self.cache_roles()
+
+    def build_topology(self):
+        """Build the nodes and the connections of the Petri net (read only once built)."""
         nodes_layers = [
             (True, "job", self.n_jobs),
             (False, "select", self.n_jobs),
@@ -198,11 +446,6 @@ class Petri_build:
         if self.standby:
             transition = Transition("standby", "allocate", color=self.n_machines)
             self.transitions[transition.uid] = transition
-
-        # Add jobs tokens
-        self.add_tokens()
-
-        print (f"JSSP {self.instance_id}: {self.n_jobs} jobs X {self.n_machines} machines, dynamic Mode: {self.dynamic} ,Standby: {self.standby} ,Transport :{self.trans}")
         
         
    
@@ -1,3 +1,4 @@
 from jsspetri.envs.fms.simulator import Simulator
+from jsspetri.envs.fms.array_simulator import ArraySimulator
 from jsspetri.envs.fms.gym_env import FmsEnv
-
+from jsspetri.envs.fms.vector_env import FmsVectorEnv
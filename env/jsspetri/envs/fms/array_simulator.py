@@ -0,0 +1,329 @@
+import math
+import numpy as np
+from jsspetri.common.array_build import Array_build
+from jsspetri.common.giffler_thompson import mask_modes, conflict_set, candidates
+from jsspetri.common.lower_bounds import LowerBounds
+
+# stages of an operation, in the order of the places it goes through
+JOB, READY, MACHINE, DELIVERY = 0, 1, 2, 3
+
+
+class ArraySimulator(Array_build):
+    """
+    Struct-of-arrays backend of the FMS simulator: same behavior as jsspetri.envs.fms.simulator.Simulator
+    but the marking is kept in NumPy arrays instead of token lists in the places, so masks, observations,
+    rewards and timed firing are vector operations.
+
+    Attributes:
+        clock (int): The internal clock of the simulation.
+        interaction_counter (int): Counter for interactions in the simulation.
+        job_next_op (np.ndarray): Next operation waiting in every job queue (job_last_op if the queue is empty).
+        job_busy (np.ndarray): True if the job has an operation in transit or being processed.
+        ready_op (np.ndarray): Operation in the ready place of every job (-1 if empty).
+        ready_busy (np.ndarray): True if the operation in the ready place arrived.
+        machine_op (np.ndarray): Operation being processed by every machine (-1 if idle).
+        machine_busy (np.ndarray): True if the machine is processing.
+        delivered (np.ndarray): Number of finished operations per machine.
+        op_logging (np.ndarray): Entry time, leave time and elapsed time of every operation in every stage (n_ops x 4 x 3).
+        op_stage (np.ndarray): Current stage of every operation (JOB, READY, MACHINE or DELIVERY).
+        lower_bounds (LowerBounds): Lower bounds on the remaining makespan , its tables are forked as bound_jobs / bound_machines.
+
+    Methods:
+        petri_reset(): Resets the marking.
+        fork() / restore(state): Copies and restores the dynamic state for lookahead search and rollouts.
+        interact(action): Performs the interactions and updates the internal state.
+        action_masks(): Checks which actions are enabled.
+        job_next_machine(): Machine requested by the next operation of every job queue.
+        is_terminal(): Checks if the simulation has reached a terminal state.
+        op_start() / op_end(): Start and end times of the operations on the machines.
+    """
+    state_attributes = ("clock", "interaction_counter", "job_next_op", "job_busy", "ready_op", "ready_busy", "machine_op",
+                        "machine_busy", "delivered", "op_logging", "op_stage", "mask", "bound_jobs", "bound_machines")
+
+    def __init__(self,
+                 instance_id,
+                 benchmark = "Taillard",
+                 trans_layout = None,
+                 dynamic=False,
+                 standby=False,
+                 trans=True,
+                 event_driven=False,
+                 mask_mode="all"):
+        """
+        Initializes the array simulator.
+
+        Parameters:
+            instanceID (str): Identifier for the JSSP instance.
+            dynamic (bool): If True, appending new operations is possible, and the termination condition is that all queues are empty.
+            trans (bool) : if True the transport time between machines in taken into considiration
+            event_driven (bool) : if True the clock jumps directly to the next completion or transport arrival instead of advancing one unit per tick
+            mask_mode (str) : "all" , "active" or "non_delay" , same as the petri simulator
+        """
+        super().__init__(instance_id,
+                         benchmark = benchmark,
+                         trans_layout = trans_layout,
+                         dynamic=dynamic,
+                         standby=standby,
+                         trans=trans)
+
+        self.event_driven = event_driven
+        assert mask_mode in mask_modes
+        self.mask_mode = mask_mode
+        self.clock = 0
+        self.interaction_counter = 0
+
+        self.job_next_op = np.zeros(self.n_jobs, dtype=np.int64)
+        self.job_busy = np.zeros(self.n_jobs, dtype=bool)
+        self.ready_op = np.full(self.n_jobs, -1, dtype=np.int64)
+        self.ready_busy = np.zeros(self.n_jobs, dtype=bool)
+        self.machine_op = np.full(self.n_machines, -1, dtype=np.int64)
+        self.machine_busy = np.zeros(self.n_machines, dtype=bool)
+        self.delivered = np.zeros(self.n_machines, dtype=np.int64)
+        self.op_logging = np.zeros((self.n_ops, 4, 3), dtype=np.int64)
+        self.op_stage = np.zeros(self.n_ops, dtype=np.int64)
+        self.lower_bounds = LowerBounds(self.op_stage, self.op_logging, self.op_job, self.op_machine,
+                                        self.op_process_time, self.op_trans_time, self.job_first_op, self.n_machines)
+        self.bound_jobs, self.bound_machines = self.lower_bounds.job_table, self.lower_bounds.machine_table
+
+        # n_jobs select actions followed by n_machines x n_jobs allocate actions , same layout as the petri simulator
+        self.mask = np.zeros(self.n_jobs + self.n_jobs * self.n_machines, dtype=bool)
+        self.allocate_mask = self.mask[self.n_jobs:].reshape(self.n_machines, self.n_jobs)
+        self.machine_index = np.arange(self.n_machines)
+
+        self.petri_reset()
+
+    def petri_reset(self):
+        """
+        Resets the marking : all the operations are back in their job queues.
+        """
+        self.clock = 0
+        self.job_next_op[:] = self.job_first_op
+        self.job_busy[:] = False
+        self.ready_op[:] = -1
+        self.ready_busy[:] = False
+        self.machine_op[:] = -1
+        self.machine_busy[:] = False
+        self.delivered[:] = 0
+        self.op_logging[:] = 0
+        self.op_stage[:] = JOB
+        self.lower_bounds.reset()
+        self.update_mask()
+
+    def decode_action(self, action):
+        """
+        Decodes a discrete action, same layout as the petri simulator.
+
+        Parameters:
+            action (int): Discrete action index.
+
+        Returns:
+            tuple: (origin, destination) , (job, ready) for select and (job, machine) for allocate.
+        """
+        action = int(action)
+        if action < self.n_jobs:
+            return action, action
+        job_machine = action - self.n_jobs
+        return job_machine % self.n_jobs, job_machine // self.n_jobs
+
+    def update_mask(self):
+        """
+        Recomputes the action mask from the marking arrays , the selects and allocations are restricted to the
+        Giffler-Thompson conflict set of the critical machine in the active and non-delay mask modes.
+        """
+        self.mask[:self.n_jobs] = (self.job_next_op < self.job_last_op) & ~self.job_busy
+        requested = np.where(self.ready_busy, self.op_machine[self.ready_op], -1)
+        np.equal(self.machine_index[:, None], requested[None, :], out=self.allocate_mask)
+        self.allocate_mask &= ~self.machine_busy[:, None]
+
+        if self.mask_mode != "all":
+            jobs, machines, start, end = candidates(self, self.op_stage, self.op_logging,
+                                                    self.job_next_op, self.job_next_op < self.job_last_op)
+            available = self.mask[jobs] | self.allocate_mask[:, jobs].any(axis=0)
+            allowed = np.zeros(self.n_jobs, dtype=bool)
+            allowed[jobs] = conflict_set(machines, start, end, self.mask_mode, available)
+            self.mask[:self.n_jobs] &= allowed
+            self.allocate_mask &= allowed[None, :]
+
+    def action_masks(self):
+        """
+        Returns the action mask (not a copy, it is updated in place by the simulator).
+        """
+        return self.mask
+
+    def job_next_machine(self):
+        """
+        Returns:
+            np.ndarray: Machine requested by the next operation of every job queue (-1 if the queue is empty).
+        """
+        next_op = np.minimum(self.job_next_op, max(self.n_ops - 1, 0))
+        return np.where(self.job_next_op < self.job_last_op, self.op_machine[next_op], -1)
+
+    def valid_action(self, action):
+        return bool(self.mask[int(action)])
+
+    def makespan_reward(self):
+        """
+        Calculate the reward.
+        Returns:
+            Any: Calculated reward .
+        """
+        if self.is_terminal:
+            return -self.clock
+        else:
+            return 0
+
+    def utilization_reward(self):
+        """
+        Calculates the utilization reward.
+
+        Returns:
+            float: Calculated reward.
+        """
+        idle_machines = np.count_nonzero(self.machine_busy)
+        x = - (idle_machines / self.n_machines)
+        return x
+
+    def is_terminal(self, step=0):
+        """
+        Checks if the simulation has reached a terminal state.
+
+        Returns:
+            bool: True if the terminal state is reached, False otherwise.
+        """
+        empty_queue = np.all(self.job_next_op == self.job_last_op)
+        empty_transit = np.all(self.ready_op < 0)
+        empty_machines = np.all(self.machine_op < 0)
+        return bool(empty_queue and empty_transit and empty_machines)
+
+    def move(self, ops, stage):
+        """
+        Moves operations to their next stage and logs the leave and entry times.
+
+        Parameters:
+            ops: Indices of the operations.
+            stage (int): Stage the operations enter.
+        """
+        self.op_logging[ops, stage - 1, 1] = self.clock
+        self.op_logging[ops, stage] = (self.clock, 0, 0)
+        self.op_stage[ops] = stage
+        self.lower_bounds.move(ops)
+
+    def time_tick(self, step=1):
+        """
+        Increments the internal clock and the elapsed time of the operations at the head of the places.
+
+        Parameters:
+            step (int): Number of clock units to advance.
+        """
+        self.clock += step
+
+        queued = self.job_next_op < self.job_last_op
+        self.op_logging[self.job_next_op[queued], JOB, 2] += step
+        self.op_logging[self.ready_op[self.ready_op >= 0], READY, 2] += step
+        self.op_logging[self.machine_op[self.machine_op >= 0], MACHINE, 2] += step
+
+    def next_event(self):
+        """
+        Computes the number of clock units until the next operation completion or transport arrival.
+
+        Returns:
+            int: Clock units to the next event (1 if no event is pending).
+        """
+        processing = self.machine_op[self.machine_op >= 0]
+        in_transit = self.ready_op[(self.ready_op >= 0) & ~self.ready_busy]
+        remaining = np.concatenate((self.op_process_time[processing] - self.op_logging[processing, MACHINE, 2],
+                                    self.op_trans_time[in_transit] - self.op_logging[in_transit, READY, 2]))
+        pending = remaining[remaining > 0]
+        return math.ceil(pending.min()) if pending.size else 1
+
+    def fire_controlled(self, action):
+        """
+        Fires the select or allocate transition of the provided action.
+
+        Parameters:
+            action: Action to be performed.
+
+        Returns:
+            bool: True if a transition is fired, False otherwise.
+        """
+        self.interaction_counter += 1
+        origin, destination = self.decode_action(action)
+
+        if not self.mask[int(action)]:
+            return False
+
+        if action < self.n_jobs:        #select
+            op = self.job_next_op[origin]
+            self.move(op, READY)
+            self.job_next_op[origin] += 1
+            self.job_busy[origin] = True
+            self.ready_op[destination] = op
+            self.ready_busy[destination] = self.op_trans_time[op] <= 0
+        else :                           #allocate
+            op = self.ready_op[origin]
+            self.move(op, MACHINE)
+            self.ready_op[origin] = -1
+            self.ready_busy[origin] = False
+            self.machine_op[destination] = op
+            self.machine_busy[destination] = True
+
+        self.update_mask()
+        return True
+
+    def fire_timed(self):
+        """
+        Fires autonomous transitions based on completion times.
+        """
+        processing = self.machine_op >= 0
+        done = np.zeros(self.n_machines, dtype=bool)
+        done[processing] = self.op_logging[self.machine_op[processing], MACHINE, 2] >= self.op_process_time[self.machine_op[processing]]
+        if done.any():
+            finished = self.machine_op[done]
+            self.move(finished, DELIVERY)
+            self.delivered[done] += 1
+            self.job_busy[self.op_job[finished]] = False
+            self.machine_busy[done] = False
+            self.machine_op[done] = -1
+
+        in_transit = (self.ready_op >= 0) & ~self.ready_busy
+        ops = self.ready_op[in_transit]
+        self.ready_busy[in_transit] = self.op_logging[ops, READY, 2] >= self.op_trans_time[ops]
+
+        self.update_mask()
+        if not self.mask.any():
+            self.time_tick(self.next_event() if self.event_driven else 1)
+
+    def interact(self, action):
+        """
+        Performs the interactions and updates internal state.
+
+        Parameters:
+            action: Action to be performed.
+        """
+        fired=self.fire_controlled(action)
+        while not self.mask.any():
+            self.fire_timed()
+            if self.is_terminal():
+                break
+
+        return fired
+
+    def op_start(self):
+        """
+        Returns:
+            np.ndarray: Time every operation entered its machine (-1 if not allocated yet).
+        """
+        return np.where(self.op_stage >= MACHINE, self.op_logging[:, MACHINE, 0], -1)
+
+    def op_end(self):
+        """
+        Returns:
+            np.ndarray: Time every operation left its machine (-1 if not finished yet).
+        """
+        return np.where(self.op_stage == DELIVERY, self.op_logging[:, MACHINE, 1], -1)
+
+
+if __name__ == "__main__":
+
+    sim = ArraySimulator("bu01", benchmark="BU", trans_layout="trans_4_1")
+    print(sim.action_masks())
@@ -0,0 +1,249 @@
+import numpy as np
+from jsspetri.common.array_build import Array_build
+
+
+class BatchSimulator(Array_build):
+    """
+    N copies of the FMS simulator stepped in lockstep : the marking of every copy is a row of
+    batched NumPy arrays, the instance arrays are shared. Same behavior as
+    jsspetri.envs.fms.simulator.Simulator for every row.
+
+    Attributes:
+        num_envs (int): Number of copies.
+        clock (np.ndarray): The internal clock of every copy (num_envs).
+        interaction_counter (np.ndarray): Counter for interactions of every copy (num_envs).
+        job_next_op, job_busy (np.ndarray): Next queued operation and busy flag of every job (num_envs x n_jobs).
+        ready_op, ready_busy, ready_elapsed (np.ndarray): Operation in transit, arrival flag and elapsed time of every ready place (num_envs x n_jobs).
+        machine_op, machine_busy, machine_elapsed (np.ndarray): Operation in process, busy flag and elapsed time of every machine (num_envs x n_machines).
+        delivered (np.ndarray): Number of finished operations per machine (num_envs x n_machines).
+        op_start, op_end (np.ndarray): Time every operation entered and left its machine, -1 if not yet (num_envs x n_ops).
+        mask (np.ndarray): Action masks of every copy (num_envs x (n_jobs + n_machines * n_jobs)).
+    """
+
+    def __init__(self,
+                 instance_id,
+                 num_envs=1,
+                 benchmark = "Taillard",
+                 trans_layout = None,
+                 dynamic=False,
+                 standby=False,
+                 trans=True,
+                 event_driven=True):
+        """
+        Initializes the batch simulator.
+
+        Parameters:
+            instanceID (str): Identifier for the JSSP instance.
+            num_envs (int): Number of copies stepped in lockstep.
+            dynamic (bool): If True, appending new operations is possible, and the termination condition is that all queues are empty.
+            trans (bool) : if True the transport time between machines in taken into considiration
+            event_driven (bool) : if True the clocks jump directly to the next completion or transport arrival instead of advancing one unit per tick
+        """
+        super().__init__(instance_id,
+                         benchmark = benchmark,
+                         trans_layout = trans_layout,
+                         dynamic=dynamic,
+                         standby=standby,
+                         trans=trans)
+
+        self.num_envs = num_envs
+        self.event_driven = event_driven
+        n, jobs, machines = num_envs, self.n_jobs, self.n_machines
+
+        self.clock = np.zeros(n, dtype=np.int64)
+        self.interaction_counter = np.zeros(n, dtype=np.int64)
+        self.job_next_op = np.zeros((n, jobs), dtype=np.int64)
+        self.job_busy = np.zeros((n, jobs), dtype=bool)
+        self.ready_op = np.full((n, jobs), -1, dtype=np.int64)
+        self.ready_busy = np.zeros((n, jobs), dtype=bool)
+        self.ready_elapsed = np.zeros((n, jobs), dtype=np.int64)
+        self.machine_op = np.full((n, machines), -1, dtype=np.int64)
+        self.machine_busy = np.zeros((n, machines), dtype=bool)
+        self.machine_elapsed = np.zeros((n, machines), dtype=np.int64)
+        self.delivered = np.zeros((n, machines), dtype=np.int64)
+        self.op_start = np.full((n, self.n_ops), -1, dtype=np.int64)
+        self.op_end = np.full((n, self.n_ops), -1, dtype=np.int64)
+
+        # n_jobs select actions followed by n_machines x n_jobs allocate actions , same layout as the petri simulator
+        self.mask = np.zeros((n, jobs + jobs * machines), dtype=bool)
+        self.allocate_mask = self.mask[:, jobs:].reshape(n, machines, jobs)
+        self.machine_index = np.arange(machines)[None, :, None]
+        self.env_index = np.arange(n)
+
+        self.petri_reset()
+
+    def petri_reset(self, envs=None):
+        """
+        Resets the marking of some copies.
+
+        Parameters:
+            envs: Boolean mask or indices of the copies to reset (all if None).
+        """
+        envs = slice(None) if envs is None else envs
+        self.clock[envs] = 0
+        self.interaction_counter[envs] = 0
+        self.job_next_op[envs] = self.job_first_op
+        self.job_busy[envs] = False
+        self.ready_op[envs] = -1
+        self.ready_busy[envs] = False
+        self.ready_elapsed[envs] = 0
+        self.machine_op[envs] = -1
+        self.machine_busy[envs] = False
+        self.machine_elapsed[envs] = 0
+        self.delivered[envs] = 0
+        self.op_start[envs] = -1
+        self.op_end[envs] = -1
+        self.update_mask()
+
+    def update_mask(self):
+        """
+        Recomputes the action masks of all copies.
+        """
+        self.mask[:, :self.n_jobs] = (self.job_next_op < self.job_last_op) & ~self.job_busy
+        requested = np.where(self.ready_busy, self.op_machine[self.ready_op], -1)
+        np.equal(self.machine_index, requested[:, None, :], out=self.allocate_mask)
+        self.allocate_mask &= ~self.machine_busy[:, :, None]
+
+    def action_masks(self):
+        """
+        Returns the action masks (not a copy, they are updated in place by the simulator).
+        """
+        return self.mask
+
+    def makespan_reward(self):
+        """
+        Returns:
+            np.ndarray: The makespan reward of every copy, same as the petri simulator.
+        """
+        return -self.clock
+
+    def utilization_reward(self):
+        """
+        Returns:
+            np.ndarray: The utilization reward of every copy, same as the petri simulator.
+        """
+        return -(np.count_nonzero(self.machine_busy, axis=1) / self.n_machines)
+
+    def is_terminal(self):
+        """
+        Returns:
+            np.ndarray: True for the copies that reached a terminal state.
+        """
+        empty_queue = np.all(self.job_next_op == self.job_last_op, axis=1)
+        empty_transit = np.all(self.ready_op < 0, axis=1)
+        empty_machines = np.all(self.machine_op < 0, axis=1)
+        return empty_queue & empty_transit & empty_machines
+
+    def time_tick(self, envs, step):
+        """
+        Increments the clocks and the elapsed times of some copies.
+
+        Parameters:
+            envs (np.ndarray): Boolean mask of the copies to advance.
+            step (np.ndarray): Number of clock units to advance every copy.
+        """
+        step = np.where(envs, step, 0)
+        self.clock += step
+        self.ready_elapsed += np.where(self.ready_op >= 0, step[:, None], 0)
+        self.machine_elapsed += np.where(self.machine_op >= 0, step[:, None], 0)
+
+    def next_event(self):
+        """
+        Computes the number of clock units until the next operation completion or transport arrival of every copy.
+
+        Returns:
+            np.ndarray: Clock units to the next event (1 if no event is pending).
+        """
+        processing = np.where(self.machine_op >= 0, self.op_process_time[self.machine_op] - self.machine_elapsed, np.inf)
+        in_transit = np.where((self.ready_op >= 0) & ~self.ready_busy, self.op_trans_time[self.ready_op] - self.ready_elapsed, np.inf)
+        remaining = np.concatenate((processing, in_transit), axis=1)
+        remaining = np.where(remaining > 0, remaining, np.inf).min(axis=1)
+        return np.where(np.isinf(remaining), 1, np.ceil(remaining)).astype(np.int64)
+
+    def fire_controlled(self, actions):
+        """
+        Fires the select or allocate transition of the action of every copy.
+
+        Parameters:
+            actions (np.ndarray): Action of every copy.
+
+        Returns:
+            np.ndarray: True for the copies where a transition is fired.
+        """
+        self.interaction_counter += 1
+        fired = self.mask[self.env_index, actions]
+
+        select = fired & (actions < self.n_jobs)
+        envs, jobs = self.env_index[select], actions[select]
+        ops = self.job_next_op[envs, jobs]
+        self.job_next_op[envs, jobs] += 1
+        self.job_busy[envs, jobs] = True
+        self.ready_op[envs, jobs] = ops
+        self.ready_elapsed[envs, jobs] = 0
+        self.ready_busy[envs, jobs] = self.op_trans_time[ops] <= 0
+
+        allocate = fired & (actions >= self.n_jobs)
+        envs, job_machine = self.env_index[allocate], actions[allocate] - self.n_jobs
+        jobs, machines = job_machine % self.n_jobs, job_machine // self.n_jobs
+        ops = self.ready_op[envs, jobs]
+        self.ready_op[envs, jobs] = -1
+        self.ready_busy[envs, jobs] = False
+        self.machine_op[envs, machines] = ops
+        self.machine_busy[envs, machines] = True
+        self.machine_elapsed[envs, machines] = 0
+        self.op_start[envs, ops] = self.clock[envs]
+
+        self.update_mask()
+        return fired
+
+    def fire_timed(self, envs):
+        """
+        Fires autonomous transitions based on completion times, then advances the clocks of the copies left without enabled actions.
+
+        Parameters:
+            envs (np.ndarray): Boolean mask of the copies to fire.
+        """
+        processing = envs[:, None] & (self.machine_op >= 0)
+        done = processing & (self.machine_elapsed >= self.op_process_time[self.machine_op])
+        done_envs, done_machines = np.nonzero(done)
+        if done_envs.size:
+            ops = self.machine_op[done_envs, done_machines]
+            self.op_end[done_envs, ops] = self.clock[done_envs]
+            self.delivered[done_envs, done_machines] += 1
+            self.job_busy[done_envs, self.op_job[ops]] = False
+            self.machine_busy[done_envs, done_machines] = False
+            self.machine_op[done_envs, done_machines] = -1
+
+        in_transit = envs[:, None] & (self.ready_op >= 0) & ~self.ready_busy
+        self.ready_busy |= in_transit & (self.ready_elapsed >= self.op_trans_time[self.ready_op])
+
+        self.update_mask()
+        idle = envs & ~self.mask.any(axis=1)
+        if idle.any():
+            self.time_tick(idle, self.next_event() if self.event_driven else 1)
+
+    def interact(self, actions):
+        """
+        Performs the interactions of all copies and advances every copy until it has an enabled action or terminates.
+
+        Parameters:
+            actions: Action of every copy.
+
+        Returns:
+            np.ndarray: True for the copies where a transition is fired.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        fired = self.fire_controlled(actions)
+
+        active = ~self.mask.any(axis=1)
+        while active.any():
+            self.fire_timed(active)
+            active &= ~self.mask.any(axis=1) & ~self.is_terminal()
+
+        return fired
+
+
+if __name__ == "__main__":
+
+    sim = BatchSimulator("ta01", num_envs=4)
+    print(sim.action_masks().shape)
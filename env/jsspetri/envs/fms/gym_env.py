@@ -3,8 +3,9 @@ from gymnasium import Env
 from gymnasium import spaces
 
 from jsspetri.envs.fms.simulator import Simulator
+from jsspetri.envs.fms.array_simulator import ArraySimulator
 from jsspetri.render.plot_fms import plot_solution, plot_job
-from jsspetri.utils.obs_fms import get_obs
+from jsspetri.utils.obs_fms import get_obs, get_obs_array
 
 
 class FmsEnv(Env):
@@ -22,7 +23,13 @@ class FmsEnv(Env):
                  observation_depth:int =1, 
                  dynamic: bool=False,
                  standby:bool=False,
-              
+                 event_driven:bool=False,
+                 backend:str="petri",
+                 auto_resolve:bool=False,
+                 joint:bool=False,
+                 mask_mode:str="all",
+                 truncation:float=None,
+                 best_makespan:int=None,
                  ):
         """
         
@@ -33,19 +40,41 @@ class FmsEnv(Env):
             render_mode (str): Rendering mode ("human" or "solution").
             instance_id (str): Identifier for the JSSP instance.
             observation_depth (int): Depth of observations in future.
+            event_driven (bool): If True the simulator jumps to the next event instead of ticking one time unit at a time.
+            backend (str): "petri" for the token based simulator or "array" for the struct-of-arrays simulator (no rendering).
+            auto_resolve (bool): If True the forced decisions (a single enabled action) are fired without returning to the agent.
+            joint (bool): If True an action assigns a job (or idle , the last choice) to every machine at once
+                          (MultiDiscrete , see joint_interact) instead of firing one select or allocate per step.
+            mask_mode (str): "all" , or "active" / "non_delay" to only enable the selects and allocations of the Giffler-Thompson
+                             conflict set of the critical machine.
+            truncation (float): If given the episode is truncated as soon as clock + lower bound on the remaining makespan
+                                exceeds truncation times the best known makespan (best_makespan , else the best finished episode).
+            best_makespan (int): The best known makespan of the instance (in clock units of the simulator).
         """
         
         
         self.dynamic=dynamic
         self.instance_id=instance_id
 
-        self.sim = Simulator(self.instance_id, benchmark = benchmark, trans = trans, trans_layout=trans_layout,dynamic=self.dynamic,standby=standby)
+        assert backend in ["petri", "array"]
+        self.backend = backend
+        self.auto_resolve = auto_resolve
+        self.joint = joint
+        self.truncation = truncation
+        self.best_makespan = best_makespan
+        simulator, self.get_obs = (ArraySimulator, get_obs_array) if backend == "array" else (Simulator, get_obs)
+
+        self.sim = simulator(self.instance_id, benchmark = benchmark, trans = trans, trans_layout=trans_layout,dynamic=self.dynamic,standby=standby,event_driven=event_driven,mask_mode=mask_mode)
         self.observation_depth = min(observation_depth, self.sim.n_machines)
    
          
         observation_size= 3 * self.sim.n_machines + 2 * (self.sim.n_jobs * self.observation_depth)  
         self.observation_space= spaces.Box(low=-1, high=self.sim.max_bound,shape=(observation_size,),dtype=np.int64)
-        self.action_space = spaces.Discrete(len (self.sim.jobs)*len(self.sim.machines)+len (self.sim.jobs))  # select and allocate combinations
+        self.observation_buffer = np.full(observation_size, -1, dtype=np.int64)   # preallocated , the dynamic padding is written once
+        if self.joint:
+            self.action_space = spaces.MultiDiscrete([self.sim.n_jobs + 1] * self.sim.n_machines)   # a job or idle per machine
+        else:
+            self.action_space = spaces.Discrete(self.sim.n_jobs*self.sim.n_machines+self.sim.n_jobs)  # select and allocate combinations
       
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = render_mode
@@ -58,8 +87,9 @@ class FmsEnv(Env):
             tuple: Initial observation and info.
         """
         self.sim.petri_reset()
-        observation = get_obs(self)
-        info = self._get_info(0,False,False)
+        _, auto_fired = self.resolve_forced()
+        observation = self.get_obs(self)
+        info = self._get_info(0,False,self.sim.is_terminal(),auto_fired)
 
         return observation, info
 
@@ -79,10 +109,98 @@ class FmsEnv(Env):
         """
         Get the action masks.
         Returns:
-            list: List of enabled actions.
+            list: List of enabled actions , the per machine masks concatenated in the joint mode.
         """ 
+        if self.joint:
+            return self.joint_masks().ravel()
         return self.sim.action_masks()
+
+    def joint_masks(self):
+        """
+        Get the choices of every machine in the joint mode : the jobs whose ready operation arrived for the machine
+        while it is idle (allocate) , the idle jobs whose next operation requests the machine (select) and idle.
+        Returns:
+            np.ndarray: Enabled choices (n_machines x n_jobs+1).
+        """
+        n_jobs, n_machines = self.sim.n_jobs, self.sim.n_machines
+        mask = self.sim.action_masks()
+        masks = np.zeros((n_machines, n_jobs + 1), dtype=bool)
+        masks[:, :n_jobs] = mask[n_jobs:].reshape(n_machines, n_jobs)
+        selectable = np.flatnonzero(mask[:n_jobs])
+        masks[self.sim.job_next_machine()[selectable], selectable] = True
+        masks[:, n_jobs] = True
+        return masks
+
+    def joint_interact(self, action):
+        """
+        Fire the choices of a joint action , machine by machine in index order (deterministic).
+        A choice fires the allocate of the job if its operation arrived , else its select followed by the allocate
+        when the transport is instantaneous and the machine idle. Choices that are not enabled when their machine
+        is served (idle , invalid or conflicting) are ignored. Time advances to the next decision epoch ,
+        also when nothing was fired (waiting).
+        Returns:
+            int: Number of fired transitions.
+        """
+        sim = self.sim
+        n_jobs = sim.n_jobs
+        fired = 0
+        for machine, job in enumerate(np.asarray(action, dtype=np.int64)):
+            if job >= n_jobs:
+                continue
+            allocate = n_jobs + machine * n_jobs + job
+            if not sim.mask[allocate] and sim.mask[job] and sim.job_next_machine()[job] == machine:
+                fired += sim.fire_controlled(job)
+            if sim.mask[allocate]:
+                fired += sim.fire_controlled(allocate)
+
+        if not fired and not sim.is_terminal():
+            # waiting : the events due now are fired , then the clock moves on
+            sim.fire_timed()
+            if sim.mask.any():
+                sim.time_tick(sim.next_event() if sim.event_driven else 1)
+                sim.fire_timed()
+        while not sim.mask.any():
+            if sim.is_terminal():
+                break
+            sim.fire_timed()
+        return fired
     
+    def resolve_forced(self):
+        """
+        Fire the forced decisions (a single enabled action) while auto_resolve is on (discrete actions only).
+        Returns:
+            tuple: Sum of the rewards of the fired actions and their number.
+        """
+        reward, auto_fired = 0, 0
+        if not self.auto_resolve or self.joint:
+            return reward, auto_fired
+
+        while not self.sim.is_terminal():
+            mask = self.sim.action_masks()
+            if np.count_nonzero(mask) != 1:
+                break
+            action = int(np.argmax(mask))
+            self.sim.interact(action)
+            reward += self.reward(action)
+            auto_fired += 1
+        return reward, auto_fired
+
+    def bound_truncated(self, terminated):
+        """
+        Check if the episode can no longer finish within truncation times the best known makespan :
+        clock + lower bound on the remaining makespan (see LowerBounds) exceeds it.
+        The makespan of every finished episode updates the best known makespan.
+        Returns:
+            bool: True if the episode shall be truncated.
+        """
+        if terminated:
+            if self.best_makespan is None or self.sim.clock < self.best_makespan:
+                self.best_makespan = self.sim.clock
+            return False
+        if self.truncation is None or self.best_makespan is None:
+            return False
+        return self.sim.clock + self.sim.lower_bounds.bound() > self.truncation * self.best_makespan
+
     def step(self, action):
         """
         Take a step in the environment.
@@ -93,19 +211,23 @@ class FmsEnv(Env):
         """
         
 
-        fired = self.sim.interact(action)  
+        fired = self.joint_interact(action) if self.joint else self.sim.interact(action)
         reward = self.reward(action)
-        observation = get_obs(self)
+        forced_reward, auto_fired = self.resolve_forced()
+        reward += forced_reward
+        observation = self.get_obs(self)
         terminated= self.sim.is_terminal()
-        info = self._get_info(reward,fired,terminated)
+        truncated = self.bound_truncated(terminated)
+        info = self._get_info(reward,fired,terminated,auto_fired)
         
-        return observation, reward, terminated, False, info
+        return observation, reward, terminated, truncated, info
 
     def render(self,zoom=False ,rank=False,format_="png",dpi=300):
         """
         Render the environment.
         """
         if self.render_mode == "solution":
+            assert self.backend == "petri", "rendering needs the token logging of the petri backend"
              
             if zoom :
                 for i in range (self.sim.n_jobs):
@@ -119,11 +241,11 @@ class FmsEnv(Env):
         Close the environment.
         """
 
-    def _get_info(self, reward,fired, terminated):
+    def _get_info(self, reward,fired, terminated, auto_fired=0):
         """
         Get information dictionary.
         """
-        return {"Reward": reward,"Fired":fired ,"Terminated": terminated}
+        return {"Reward": reward,"Fired":fired ,"Terminated": terminated, "AutoFired": auto_fired}
 
 if __name__ == "__main__":
     
@@ -1,5 +1,7 @@
-import copy
+import math
+import numpy as np
 from jsspetri.common.petri_build import Petri_build
+from jsspetri.common.giffler_thompson import mask_modes, conflict_set, candidates
 
 class Simulator(Petri_build):
     """
@@ -8,21 +10,29 @@ class Simulator(Petri_build):
     Attributes:
         clock (int): The internal clock of the simulation.
         interaction_counter (int): Counter for interactions in the simulation.
-        delivery_history (dict): Dictionary storing the delivery history.
+        completion_log (list): (clock, token) of every finished operation, in completion order.
         action_map (dict): Mapping for actions in the simulation from discreate to multidiscreate.
 
     Methods:
         __init__(instanceID): Initializes the JSSPSimulator.
         time_tick(gui, action): Increments the internal clock and updates token logging.
+        next_event(): Computes the number of clock units until the next timed event.
      
         transfer_token(origin, destination, current_clock): Transfers a token from one place to another.
         fire_colored(action): Fires colored transitions based on the provided action.
         fire_timed(): Fires timed transitions based on completion times.
         petri_interact(gui, action): Performs Petri net interactions and updates internal state.
         petri_reset(): Resets the internal state of the Petri net.
+        fork() / restore(state): Copies and restores the dynamic state for lookahead search and rollouts.
         is_terminal(): Checks if the simulation has reached a terminal state.
         action_mapping(n_machines, n_jobs): Maps multidiscrete actions to a more usable format.
+        decode_action(action): Decodes a discrete action into its (origin, destination) indices.
+        reset_mask(): Rebuilds the persistent action mask from the current marking.
+        restrict_mask(): Restricts the mask to the Giffler-Thompson conflict set of the critical machine (active / non-delay mask modes).
+        job_request(job): Machine requested by the ready token of a job.
+        update_mask(job, machine): Updates the action mask entries touched by a job and/or a machine.
         action_masks(): Checks which allocations are enabled.
+        job_next_machine(): Machine requested by the next operation of every job queue.
     """
 
     def __init__(self, 
@@ -31,7 +41,9 @@ class Simulator(Petri_build):
                  trans_layout = None,
                  dynamic=False,
                  standby=False,
-                 trans=True):
+                 trans=True,
+                 event_driven=False,
+                 mask_mode="all"):
         """
         Initializes the JSSPSimulator.
 
@@ -40,6 +52,9 @@ class Simulator(Petri_build):
             dynamic (bool): If True, appending new operations is possible, and the termination condition is that all queues are empty.
 
             trans (bool) : if True the transport time between machines in taken into considiration
+            event_driven (bool) : if True the clock jumps directly to the next completion or transport arrival instead of advancing one unit per tick
+            mask_mode (str) : "all" for every color compatible action , "active" / "non_delay" to only enable the selects and
+                              allocations of the Giffler-Thompson conflict set of the critical machine (active or non-delay schedules)
 
         """
         super().__init__(instance_id,
@@ -49,10 +64,14 @@ class Simulator(Petri_build):
                          standby=standby,
                          trans=trans)
         # self.i = 0
+        self.event_driven = event_driven
+        assert mask_mode in mask_modes
+        self.mask_mode = mask_mode
         self.clock = 0
         self.interaction_counter = 0
-        self.delivery_history = {}
-        self.jobs,self.select,self.ready,self.allocate,self.machines, self.deliver,self.delivery  = [], [], [], [], [] ,[], []
+        
+        # persistent action mask : n_jobs select actions followed by n_machines x n_jobs allocate actions
+        self.init_mask(n_selects=self.n_jobs)
         self.petri_reset()
         
         self.action_map = self.action_mapping(self.n_machines, self.n_jobs)
@@ -63,18 +82,9 @@ class Simulator(Petri_build):
         Resets the internal state of the Petri net.
         """
         self.clock = 0
-        for place in self.places.values():
-            place.token_container = []
-        self.add_tokens()
-   
-
-        self.jobs = [p for p in self.places.values() if p.uid in self.filter_nodes("job")]
-        self.select = [p for p in self.transitions.values() if p.uid in self.filter_nodes("select")]
-        self.ready = [p for p in self.places.values() if p.uid in self.filter_nodes("ready")]
-        self.allocate = [t for t in self.transitions.values() if t.uid in self.filter_nodes("allocate")]
-        self.machines = [p for p in self.places.values() if p.uid in self.filter_nodes("machine")]
-        self.deliver = [t for t in self.transitions.values() if t.uid in self.filter_nodes("finish_op")]
-        self.delivery = [p for p in self.places.values() if p.uid in self.filter_nodes("finished_ops")]
+        self.restore_marking(self.initial_marking)
+        self.completion_log = []
+        self.reset_mask()
         
 
     def action_mapping(self, n_machines, n_jobs):
@@ -165,50 +175,112 @@ class Simulator(Petri_build):
     
   
     def valid_action(self,action):
-        # print(self.i) if self.i < 500 else None
-        valid = False
-        origin,destination=self.action_map[int(action)]
-        
-        
-        if action < self.n_jobs:  #select :     
-            if self.jobs[origin].token_container  and not self.jobs[origin].busy:
-                valid =True   # enabled if a token is available and the job is not being processed 
-            
-        else  :   #allocate 
-
-            if self.ready [origin].token_container :   
-                token = self.ready[origin].token_container[0]
-      
-                ready =  self.ready[origin].busy    # a token is ready to be allocated
-                color = token.color[1] == self.machines[destination].color
-                machine = not self.machines[destination].busy
-                
-                valid =  color and machine and ready 
-                
-        return valid 
-                
-            
+        return bool(self.mask[int(action)])
+
+    def restrict_mask(self):
+        """
+        Restricts the selects and the allocations to the Giffler-Thompson conflict set of the critical machine
+        in the active and non-delay mask modes (the entries are rebuilt from the marking first).
+        """
+        if self.mask_mode == "all":
+            return
+
+        n_jobs = self.n_jobs
+        selectable = np.array([bool(place.token_container) and not place.busy for place in self.jobs])
+        machine_busy = np.array([place.busy for place in self.machines])
+        requested = self.requested_machine
+        arrived = np.flatnonzero(requested >= 0)
+        allocatable = np.zeros(n_jobs, dtype=bool)
+        allocatable[arrived] = ~machine_busy[requested[arrived]]
+
+        jobs, machines, start, end = candidates(self, self.event_log.stage, self.event_log.times,
+                                                self.job_stats.next_op, self.job_stats.remaining_ops > 0)
+        allowed = np.zeros(n_jobs, dtype=bool)
+        allowed[jobs] = conflict_set(machines, start, end, self.mask_mode, selectable[jobs] | allocatable[jobs])
+        self.mask[:n_jobs] = selectable & allowed
+
+        allocate_mask = self.mask[n_jobs:].reshape(self.n_machines, n_jobs)
+        allocate_mask[:] = False
+        allocate_mask[requested[arrived], arrived] = (allocatable & allowed)[arrived]
+
+
+    def job_request(self, job):
+        """
+        Returns:
+            int: Machine requested by the token of the job arrived in its ready place (-1 if none).
+        """
+        ready = self.ready[job]
+        return ready.token_container[0].color[1] if ready.token_container and ready.busy else -1
+
+    def update_mask(self, job=None, machine=None):
+        """
+        Updates the action mask entries touched by a job and/or a machine.
+        A select is enabled if a token is available and the job is not being processed,
+        an allocate is enabled if the ready token arrived and its machine is idle.
+
+        Parameters:
+            job (int): Index of the job whose job/ready places changed.
+            machine (int): Index of the machine whose place changed.
+        """
+        if job is not None:
+            self.mask[job] = bool(self.jobs[job].token_container) and not self.jobs[job].busy
+        super().update_mask(job=job, machine=machine)
 
     def action_masks(self):
-        actions = range(len (self.action_map))
-        enabled_mask = list(map (self.valid_action, actions))
-        # self.i += 1
-        return enabled_mask
+        """
+        Returns the persistent action mask (not a copy, it is updated in place by the simulator).
+        """
+        return self.mask
+
+    def job_next_machine(self):
+        """
+        Returns:
+            np.ndarray: Machine requested by the next operation of every job queue (-1 if the queue is empty).
+        """
+        next_op = np.minimum(self.job_stats.next_op, len(self.op_machine) - 1)
+        return np.where(self.job_stats.remaining_ops > 0, self.op_machine[next_op], -1)
         
 
-    def time_tick(self):
+    def time_tick(self, step=1):
         """
         Increments the internal clock and updates token logging.
+
+        Parameters:
+            step (int): Number of clock units to advance.
         """
-        self.clock += 1
+        self.clock += step
         self.safeguard()
         
         for place in self.jobs+ self.ready + self.machines:
                 if  place.token_container:
                     token = place.token_container[0]
             
-                    last_logging = list(token.logging.keys())[-1]
-                    token.logging[last_logging][2] += 1   # elapsed time increament 
+                    self.event_log.tick(token.op_id, step)   # elapsed time increament 
+
+
+    def next_event(self):
+        """
+        Computes the number of clock units until the next timed event, i.e. the earliest
+        operation completion in the machines or transport arrival in the ready places.
+
+        Returns:
+            int: Clock units to the next event (1 if no event is pending).
+        """
+        remaining = []
+        for machine in self.machines:
+            if machine.token_container:
+                token = machine.token_container[0]
+                elapsed_time = self.event_log.elapsed(token.op_id)
+                remaining.append(token.process_time - elapsed_time)
+
+        for ready in self.ready:
+            if ready.token_container and not ready.busy:
+                token = ready.token_container[0]
+                elapsed_time = self.event_log.elapsed(token.op_id)
+                remaining.append(token.trans_time - elapsed_time)
+
+        pending = [r for r in remaining if r > 0]
+        return math.ceil(min(pending)) if pending else 1
 
 
     def transfer_token(self, origin, destination, clock=0):
@@ -224,12 +296,12 @@ class Simulator(Petri_build):
         if not origin.token_container:# place empty 
             return False
 
-        token = copy.copy(origin.token_container[0])
+        token = origin.token_container.popleft()
         destination.token_container.append(token)
-        origin.token_container.pop(0)
 
-        token.logging[origin.uid][1] = clock
-        token.logging[destination.uid] = [clock, 0, 0]
+        self.event_log.move(token.op_id, clock)
+        self.job_stats.move(token.op_id, clock)
+        self.lower_bounds.move(token.op_id)
 
         return True
 
@@ -249,23 +321,27 @@ class Simulator(Petri_build):
         
         self.interaction_counter += 1
         
-        origin, destination = self.action_map[int(action)]
+        origin, destination = self.decode_action(action)
         # print((origin, destination))
         
-        if action in [index for index, value in enumerate(self.action_masks()) if value]: 
+        if self.mask[int(action)]: 
             
             if action < self.n_jobs :        #select
                selected= self.transfer_token(self.jobs[origin], self.ready[destination], self.clock) 
                self.jobs[origin].busy= True
                token = self.ready[destination].token_container[0]
-               _, _, elapsed_time = list(token.logging.items())[-1][-1]
+               elapsed_time = self.event_log.elapsed(token.op_id)
                if elapsed_time >= token.trans_time:
                    self.ready[destination].busy = True
+               self.update_mask(job=origin)
+               self.restrict_mask()
                return selected
             else :                           #allocate 
                 allocated = self.transfer_token(self.ready[origin], self.machines[destination], self.clock)  
                 self.ready[origin].busy = False
                 self.machines[destination].busy = True 
+                self.update_mask(job=origin, machine=destination)
+                self.restrict_mask()
                 
                 return allocated
             
@@ -281,24 +357,27 @@ class Simulator(Petri_build):
         for place in self.machines + self.ready:
             if place.token_container:
                 token = place.token_container[0]
-                _, _, elapsed_time = list(token.logging.items())[-1][-1]
+                elapsed_time = self.event_log.elapsed(token.op_id)
 
                 # if  place.type == "machine" and elapsed_time> token.process_time  :
                 # The jobs shall finish right when the elapsed time is equal to process times
                 if place.type == "machine" and elapsed_time >= token.process_time:
                     self.transfer_token(place, self.delivery[place.color], self.clock)
+                    self.completion_log.append((self.clock, token))
                     self.jobs[token.color[0]].busy = False
                     self.machines[token.color[1]].busy = False
+                    self.update_mask(job=token.color[0], machine=token.color[1])
 
                 # elif  place.type == "ready" and elapsed_time> token.trans_time:
                 # The tokens shall be ready right when the elapsed time is equal to process times
-                elif place.type == "ready" and elapsed_time >= token.trans_time:
+                elif place.type == "ready" and elapsed_time >= token.trans_time and not place.busy:
                     self.ready[token.color[0]].busy = True   # token is available
+                    self.update_mask(job=token.color[0])
 
-        self.delivery_history[self.clock] = [token for place in self.delivery for token in place.token_container]
         # If delivery is done, at least one ready will be free, thus more valid actions, without ticking the time
-        if sum(self.action_masks()) == 0:
-            self.time_tick()
+        self.restrict_mask()
+        if not self.mask.any():
+            self.time_tick(self.next_event() if self.event_driven else 1)
 
   
     def interact(self, action):
@@ -312,7 +391,7 @@ class Simulator(Petri_build):
 
         fired=self.fire_controlled(action)
         # print(self.action_masks())
-        while sum(self.action_masks()) == 0:
+        while not self.mask.any():
             self.fire_timed()
             if self.is_terminal():
                 break
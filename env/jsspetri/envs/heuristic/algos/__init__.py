@@ -20,6 +20,8 @@ from .lpsr import Lpsr
 from .swt import Swt
 from .lwt import Lwt
 
+from .engine import RuleEngine, Weighted
+
 
 def info(acronym):
     explanations = {
@@ -42,7 +44,11 @@ def info(acronym):
 
 
 
-def init_heuristics(elite):
+def init_heuristics(elite, order=None):
+      """
+      Instantiate the heuristics , in the default order or in the given order of labels (e.g. ranked by the portfolio runner),
+      only the first (elite) ones are kept if elite is given.
+      """
      
       algos = {
           
@@ -62,6 +68,9 @@ def init_heuristics(elite):
           13: Ltwr, 
          }
     
+      if order is not None:
+          algos = {idx: algos[heuristic_index(label)] for idx, label in enumerate(order)}
+
       if elite == None :
           heuristic_obj=[algos[idx]() for idx in algos ]
       else :
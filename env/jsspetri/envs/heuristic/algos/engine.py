@@ -0,0 +1,153 @@
+import numpy as np
+
+# rule : (feature scored , +1 to prefer the highest value / -1 to prefer the lowest)
+rules = {
+    "FIFO": ("action", -1),
+    "LIFO": ("action", 1),
+    "SPT":  ("total_time", -1),
+    "LPT":  ("total_time", 1),
+    "SPS":  ("total_ops", -1),
+    "LPS":  ("total_ops", 1),
+    "SPSR": ("remaining_ops", -1),
+    "LPSR": ("remaining_ops", 1),
+    "SPTN": ("next_process_time", -1),
+    "LPTN": ("next_process_time", 1),
+    "LTWR": ("remaining_work", -1),
+    "MTWR": ("remaining_work", 1),
+    "SWT":  ("waiting_time", -1),
+    "LWT":  ("waiting_time", 1),
+}
+
+feature_names = ("action", "total_time", "total_ops", "remaining_ops", "next_process_time", "remaining_work", "waiting_time")
+
+
+class RuleEngine:
+    """
+    Scores the enabled allocations of a simulator with all the dispatching rules in one pass,
+    from the static job arrays of the instance and the job statistics of the simulator.
+
+    Every rule scores an allocation with one feature of its job (or the action index for FIFO/LIFO) ,
+    the highest score wins and ties go to the lowest action index. A weighted combination of rules
+    scores with the same features , so it costs the same as a single rule.
+    """
+
+    def __init__(self, sim):
+        """
+        Precompute the static job arrays.
+
+        Parameters:
+            sim: The simulator (allocate actions indexed machine * n_jobs + job , an optional standby action last).
+        """
+        self.sim = sim
+        self.n_allocations = sim.n_jobs * sim.n_machines
+
+        instance = sim.instance
+        self.total_time = np.zeros(sim.n_jobs, dtype=np.int64)
+        self.total_time[:len(instance)] = instance.process_times.sum(axis=1) + instance.features.sum(axis=(1, 2))
+        self.total_ops = np.zeros(sim.n_jobs, dtype=np.int64)
+        self.total_ops[:len(instance)] = instance.n_ops
+
+        self.rule_feature = {label: feature_names.index(feature) for label, (feature, _) in rules.items()}
+        self.rule_sign = {label: sign for label, (_, sign) in rules.items()}
+
+    def features(self):
+        """
+        Get the features of the enabled allocations.
+
+        Returns:
+            np.ndarray: The enabled allocate actions.
+            np.ndarray: The features of every enabled action (n_features x n_enabled).
+        """
+        enabled = np.flatnonzero(self.sim.action_masks()[:self.n_allocations])
+        jobs = enabled % self.sim.n_jobs
+        stats = self.sim.job_stats
+        values = np.stack((enabled,
+                           self.total_time[jobs],
+                           self.total_ops[jobs],
+                           stats.remaining_ops[jobs],
+                           stats.next_process_time[jobs],
+                           stats.remaining_work[jobs],
+                           stats.waiting_time[jobs]))
+        return enabled, values
+
+    def coefficients(self, weights):
+        """
+        Fold rule weights into feature coefficients.
+
+        Parameters:
+            weights (dict): Weight of every rule label.
+
+        Returns:
+            np.ndarray: Coefficient of every feature.
+        """
+        coefficients = np.zeros(len(feature_names))
+        for label, weight in weights.items():
+            coefficients[self.rule_feature[label]] += weight * self.rule_sign[label]
+        return coefficients
+
+    def scores(self, labels=None):
+        """
+        Score the enabled allocations with several rules at once.
+
+        Parameters:
+            labels (list): The rules to score , all of them if None.
+
+        Returns:
+            np.ndarray: The enabled allocate actions.
+            np.ndarray: The score of every enabled action for every rule (n_rules x n_enabled) , higher is better.
+        """
+        labels = list(rules) if labels is None else labels
+        enabled, values = self.features()
+        signs = np.array([self.rule_sign[label] for label in labels])
+        rows = [self.rule_feature[label] for label in labels]
+        return enabled, signs[:, None] * values[rows]
+
+    def decide(self, labels=None):
+        """
+        Get the action chosen by several rules at once.
+
+        Parameters:
+            labels (list or str): The rules , all of them if None.
+
+        Returns:
+            np.ndarray: The action chosen by every rule (int if a single label is given) ,
+                        the standby action (or None without standby) if no allocation is enabled.
+        """
+        single = isinstance(labels, str)
+        enabled, scores = self.scores([labels] if single else labels)
+        if len(enabled) == 0:
+            actions = np.full(len(scores), self.idle_action(), dtype=object)
+        else:
+            actions = enabled[np.argmax(scores, axis=1)]
+        return actions[0] if single else actions
+
+    def combine(self, weights):
+        """
+        Get the action chosen by a weighted linear combination of rules.
+
+        Parameters:
+            weights (dict): Weight of every rule label , e.g. {"MTWR": 1, "SPTN": 0.5}.
+
+        Returns:
+            int: The chosen action , the standby action (or None without standby) if no allocation is enabled.
+        """
+        enabled, values = self.features()
+        if len(enabled) == 0:
+            return self.idle_action()
+        return enabled[np.argmax(self.coefficients(weights) @ values)]
+
+    def idle_action(self):
+        return self.n_allocations if self.sim.standby else None
+
+
+class Weighted():
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        self.label = "+".join(f"{weight}*{label}" for label, weight in self.weights.items())
+        self.type_ = "composite"
+
+    def __str__(self):
+        return f"Weighted combination of dispatching rules ({self.label})."
+
+    def decide(self, sim):
+        return sim.rule_engine.combine(self.weights)
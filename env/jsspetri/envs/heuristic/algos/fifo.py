@@ -6,13 +6,5 @@ class Fifo():
         self.type_="static"
     def __str__(self):
        return  "First in first out (FIFO) , always return the enabled job with the lowest index."
-    def decide(self,sim):
-        mask =sim.action_masks()
-        
-        return min((index for index, value in enumerate(mask) if value), default=None)
-    
-    
-    
-    
-    
-        
\ No newline at end of file
+    def decide(self, sim):
+        return sim.rule_engine.decide(self.label)
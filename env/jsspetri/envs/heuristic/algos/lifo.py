@@ -6,12 +6,5 @@ class Lifo():
         self.type_="static"
     def __str__(self):
        return  "Last in first out (LIFO) : always return the enabled job with the higest index."
-    def decide(self,sim):
-        mask =sim.action_masks()
-        
-        return max((index for index, value in enumerate(mask) if value), default=None)
-    
-    
-    
-    
-    
\ No newline at end of file
+    def decide(self, sim):
+        return sim.rule_engine.decide(self.label)
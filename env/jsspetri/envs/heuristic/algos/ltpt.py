@@ -10,10 +10,7 @@ class Ltpt():
             return env.sim.action_map[action][0]
         
         def get_processing_time(job):
-            total_time=0     
-            original_job = env.sim.instance[job]
-            for op in original_job:
-                total_time += sum(original_job[op])
+            total_time = env.sim.instance.process_times[job].sum() + env.sim.instance.features[job].sum()
             return total_time
                 
         enabled_action = [index for index, value in enumerate(env.action_masks()) if value]  
@@ -3,7 +3,7 @@ from gymnasium import Env
 from gymnasium import spaces
 
 from jsspetri.envs.heuristic.simulator import Simulator
-from jsspetri.envs.heuristic.algos import heuristic_index
+from jsspetri.envs.heuristic.portfolio import elite_order
 
 
 from jsspetri.render.plot_mono import plot_solution
@@ -24,7 +24,11 @@ class HeuristicEnv(Env):
                  dynamic: bool=False,
                  standby:bool=False,
                  elite= None,
-                
+                 benchmark: str="Taillard",
+                 ranked: bool=False,
+                 macro_decisions: int=1,
+                 macro_interval: int=None,
+                 macro_on_completion: bool=False,
                  ):
         """
         
@@ -35,16 +39,25 @@ class HeuristicEnv(Env):
             render_mode (str): Rendering mode ("human" or "solution").
             instance_id (str): Identifier for the JSSP instance.
             observation_depth (int): Depth of observations in future.
+            elite (int): Number of heuristics kept as actions , all of them if None.
+            ranked (bool): If True the heuristics are ordered by their makespan on the instance (see portfolio.elite_order),
+                           so elite keeps the best ones for this instance instead of the default order.
+            macro_decisions (int): Allocations made with the chosen heuristic per step (no limit if None).
+            macro_interval (int): Also end the step once the clock advanced by this number of time units.
+            macro_on_completion (bool): Also end the step once a machine completed an operation.
         """
 
         self.dynamic=dynamic
         self.instance_id=instance_id
  
-        self.sim = Simulator(self.instance_id,dynamic=self.dynamic,standby=standby , elite=elite)
+        order = elite_order(self.instance_id, benchmark) if ranked else None
+        self.macro = {"decisions": macro_decisions, "interval": macro_interval, "on_completion": macro_on_completion}
+        self.sim = Simulator(self.instance_id, benchmark=benchmark, dynamic=self.dynamic,standby=standby , elite=elite, order=order)
         self.observation_depth = min(observation_depth, self.sim.n_machines)
  
         observation_size= 3 * self.sim.n_machines + 2 * (self.sim.n_jobs * self.observation_depth)  
         self.observation_space= spaces.Box(low=-1, high=self.sim.max_bound,shape=(observation_size,),dtype=np.int64)
+        self.observation_buffer = np.full(observation_size, -1, dtype=np.int64)   # preallocated , the dynamic padding is written once
 
         self.action_space = spaces.Discrete(len(self.sim.heuristics))   #number of heuristics
       
@@ -61,7 +74,7 @@ class HeuristicEnv(Env):
         """
         self.sim.petri_reset()
         observation = get_obs(self)
-        info = self._get_info(0,False,False)
+        info = self._get_info(0,False,False,0)
         
         return observation, info
 
@@ -82,15 +95,15 @@ class HeuristicEnv(Env):
         """
         Take a step in the environment.
         Parameters:
-            action: Heuristic rule for dispatch .
+            action: Heuristic rule for dispatch , applied until the macro step ends (one allocation by default).
         Returns:
             tuple: New observation, reward, termination status, info.
         """
-        fired = self.sim.interact(action)  
+        fired, allocations = self.sim.macro_interact(action, **self.macro)
         terminated= self.sim.is_terminal()
         reward = self.reward(terminated)
         observation = get_obs(self)
-        info = self._get_info(reward,fired,terminated)
+        info = self._get_info(reward,fired,terminated,allocations)
         
         return observation, reward, terminated, False, info
 
@@ -107,14 +120,14 @@ class HeuristicEnv(Env):
         Close the environment.
         """
         
-    def _get_info(self, reward,fired, terminated):
+    def _get_info(self, reward,fired, terminated, allocations):
         """
         Get information dictionary.
         """
-        return {"Reward": reward,"Fired":fired ,"Terminated": terminated}
+        return {"Reward": reward,"Fired":fired ,"Terminated": terminated, "Allocations": allocations}
     
     def heuristic_index(self,heuristic_label):
-        return  heuristic_index(heuristic_label)
+        return  [heuristic.label for heuristic in self.sim.heuristics].index(heuristic_label)
     
     
 if __name__ == "__main__":
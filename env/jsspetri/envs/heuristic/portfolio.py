@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    import msvcrt
+    fcntl = None
+
+from jsspetri.common.instance_loader import instance_path, instance_checksum
+from jsspetri.envs.heuristic.simulator import Simulator
+from jsspetri.envs.heuristic.algos import init_heuristics, heuristic_index
+
+
+def play(instance_id, benchmark, label):
+    """
+    Play a dispatching rule on an instance until the schedule is complete.
+
+    Parameters:
+        instance_id (str): The instance.
+        benchmark (str): The benchmark folder of the instance.
+        label (str): The rule label (e.g. "MTWR").
+
+    Returns:
+        tuple: The makespan and the runtime in seconds.
+    """
+    start_time = time.time()
+    sim = Simulator(instance_id, benchmark=benchmark)
+    heuristic_id = heuristic_index(label)
+    while not sim.is_terminal():
+        sim.interact(heuristic_id)
+    return sim.clock, time.time() - start_time
+
+
+def cache_file(benchmark):
+    """
+    Returns:
+        str: The result cache of the benchmark , next to its instances.
+    """
+    return instance_path(benchmark, "portfolio.json")
+
+
+def load_cache(path):
+    """
+    Returns:
+        dict: (makespan, runtime) keyed by "checksum:label" , empty if there is no readable cache.
+    """
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def cache_lock(path):
+    """
+    Hold an exclusive lock on the lock file next to a cache (blocks until the other runs release it).
+    """
+    with open(f"{path}.lock", 'a+') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def save_cache(path, results):
+    """
+    Merge results into the result cache. The cache on disk is read , merged and replaced under the lock of the cache
+    so the results of concurrent runs are kept (nothing is written if the folder is read only).
+
+    Parameters:
+        path (str): The cache file.
+        results (dict): (makespan, runtime) keyed by "checksum:label".
+    """
+    try:
+        with cache_lock(path):
+            descriptor, temp_path = tempfile.mkstemp(suffix=".json", dir=os.path.dirname(path))
+            try:
+                with os.fdopen(descriptor, 'w') as file:
+                    cache = load_cache(path)
+                    cache.update(results)
+                    json.dump(cache, file, indent=1, sort_keys=True)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+    except OSError:
+        pass
+
+
+def run_portfolio(instances, benchmark="Taillard", labels=None, workers=None):
+    """
+    Play every rule on every instance on a process pool , the results are cached per instance checksum and rule
+    so a known instance is not played again.
+
+    Parameters:
+        instances (list): Instance ids of the benchmark , or (instance_id, benchmark) tuples.
+        benchmark (str): The benchmark of the instances given by id.
+        labels (list): The rules to play , all of them if None.
+        workers (int): Size of the process pool , the rules are played in this process if 1 (all the cores if None).
+
+    Returns:
+        dict: {instance: {label: (makespan, runtime)}} for every instance as given.
+    """
+    labels = [heuristic.label for heuristic in init_heuristics(None)] if labels is None else labels
+    instances = [(item, benchmark) if isinstance(item, str) else tuple(item) for item in instances]
+
+    caches, keys, missing = {}, {}, []
+    for instance_id, instance_benchmark in instances:
+        path = cache_file(instance_benchmark)
+        if path not in caches:
+            caches[path] = load_cache(path)
+        checksum = instance_checksum(instance_id, instance_benchmark)
+        for label in labels:
+            key = f"{checksum}:{label}"
+            keys[(instance_id, instance_benchmark, label)] = (path, key)
+            if key not in caches[path]:
+                missing.append((instance_id, instance_benchmark, label))
+
+    if missing:
+        if workers == 1:
+            played = [play(*task) for task in missing]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                played = list(pool.map(play, *zip(*missing)))
+
+        new_results = {}
+        for task, result in zip(missing, played):
+            path, key = keys[task]
+            caches[path][key] = list(result)
+            new_results.setdefault(path, {})[key] = list(result)
+        for path, results in new_results.items():
+            save_cache(path, results)
+
+    results = {}
+    for instance_id, instance_benchmark in instances:
+        name = instance_id if instance_benchmark == benchmark else (instance_id, instance_benchmark)
+        results[name] = {}
+        for label in labels:
+            path, key = keys[(instance_id, instance_benchmark, label)]
+            results[name][label] = tuple(caches[path][key])
+
+    return results
+
+
+def elite_order(instance_id, benchmark="Taillard", workers=None):
+    """
+    Rank the rules by their makespan on an instance (ties keep the default order of init_heuristics).
+
+    Returns:
+        list: The rule labels , best first , to pass as the order of init_heuristics.
+    """
+    results = run_portfolio([instance_id], benchmark, workers=workers)[instance_id]
+    return sorted(results, key=lambda label: results[label][0])
+
+
+if __name__ == "__main__":
+
+    results = run_portfolio([f"ta{i:02d}" for i in range(1, 11)])
+    for instance_id, rules in results.items():
+        best = min(rules, key=lambda label: rules[label][0])
+        print(f"{instance_id}: best {best} ({rules[best][0]}) , order {elite_order(instance_id)}")
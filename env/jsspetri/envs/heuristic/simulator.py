@@ -1,7 +1,6 @@
-import copy
 import numpy as np 
 from jsspetri.common.petri_build import Petri_build
-from jsspetri.envs.heuristic.algos import init_heuristics
+from jsspetri.envs.heuristic.algos import init_heuristics, RuleEngine
 
 class Simulator(Petri_build):
     """
@@ -10,8 +9,9 @@ class Simulator(Petri_build):
     Attributes:
         clock (int): The internal clock of the simulation.
         interaction_counter (int): Counter for interactions in the simulation.
-        delivery_history (dict): Dictionary storing the delivery history.
+        completion_log (list): (clock, token) of every finished operation, in completion order.
         action_map (dict): Mapping for actions in the simulation from discreate to multidiscreate.
+        rule_engine (RuleEngine): Scores the enabled allocations with the dispatching rules in one pass.
 
     Methods:
         __init__(instanceID): Initializes the JSSPSimulator.
@@ -21,17 +21,25 @@ class Simulator(Petri_build):
         fire_colored(action): Fires colored transitions based on the provided action.
         fire_timed(): Fires timed transitions based on completion times.
         petri_interact(gui, action): Performs Petri net interactions and updates internal state.
+        macro_interact(heuristic_id, ...): Applies a heuristic until a decision-relevant event.
+        dispatch(action): Fires a decided action and the timed transitions until the next decision.
         petri_reset(): Resets the internal state of the Petri net.
+        fork() / restore(state): Copies and restores the dynamic state for lookahead search and rollouts.
         is_terminal(): Checks if the simulation has reached a terminal state.
         action_mapping(n_machines, n_jobs): Maps multidiscrete actions to a more usable format.
+        decode_action(action): Decodes a discrete action into its (job, machine) indices.
+        reset_mask(): Rebuilds the persistent action mask from the current marking.
+        update_mask(job, machine): Updates the action mask entries touched by a job and/or a machine.
         action_masks(): Checks which allocations are enabled.
     """
 
     def __init__(self, 
                  instance_id, 
+                 benchmark="Taillard",
                  dynamic=False,
                  standby=False,
-                 elite =None
+                 elite =None,
+                 order=None
                  ):
         """
         Initializes the JSSPSimulator.
@@ -39,20 +47,25 @@ class Simulator(Petri_build):
         Parameters:
             instanceID (str): Identifier for the JSSP instance.
             dynamic (bool): If True, appending new operations is possible, and the termination condition is that all queues are empty.
+            benchmark (str): The benchmark folder of the instance.
             elite (int) : to only concider the top (n) heuristics , by default all heuristics are used 
+            order (list) : labels of the heuristics in the order of the actions (e.g. ranked by the portfolio runner) , the default order if None
             trans (bool) : if True the transport time between machines in taken into considiration
         """
         super().__init__(instance_id, 
+                         benchmark=benchmark,
                          dynamic=dynamic,
                          standby=standby)
 
         self.clock = 0
         self.interaction_counter = 0
-        self.delivery_history = {}
-        self.jobs,self.select,self.ready,self.allocate,self.machines, self.deliver,self.delivery  = [], [], [], [], [] ,[], []
+        
+        # persistent action mask : n_machines x n_jobs allocate actions followed by the standby action
+        self.init_mask(standby=self.standby)
         self.petri_reset()
         
-        self.heuristics=init_heuristics(elite)
+        self.heuristics=init_heuristics(elite, order)
+        self.rule_engine = RuleEngine(self)
         self.action_map = self.action_mapping(self.n_machines, self.n_jobs)
         
     
@@ -62,18 +75,9 @@ class Simulator(Petri_build):
         Resets the internal state of the Petri net.
         """
         self.clock = 0
-        for place in self.places.values():
-            place.token_container = []
-        self.add_tokens()
-   
-    
-        self.jobs = [p for p in self.places.values() if p.uid in self.filter_nodes("job")]
-        self.select = [p for p in self.transitions.values() if p.uid in self.filter_nodes("select")]
-        self.ready = [p for p in self.places.values() if p.uid in self.filter_nodes("ready")]
-        self.allocate = [t for t in self.transitions.values() if t.uid in self.filter_nodes("allocate")]
-        self.machines = [p for p in self.places.values() if p.uid in self.filter_nodes("machine")]
-        self.deliver = [t for t in self.transitions.values() if t.uid in self.filter_nodes("finish_op")]
-        self.delivery = [p for p in self.places.values() if p.uid in self.filter_nodes("finished_ops")]
+        self.restore_marking(self.initial_marking)
+        self.completion_log = []
+        self.reset_mask()
         
         
 
@@ -103,7 +107,6 @@ class Simulator(Petri_build):
              mapping_dict.update(idle)
 
          return mapping_dict
-    
 
     def utilization_reward(self):
         """
@@ -131,31 +134,14 @@ class Simulator(Petri_build):
     
   
     def valid_action(self, action):
-        valid = False
-        job_idx, machine_idx = self.action_map[int(action)]
-    
-        if job_idx is None:
-            return True
-        else:
-            if self.jobs[job_idx].token_container:
-                token = self.jobs[job_idx].token_container[0]
-                machine = self.machines[machine_idx]
-    
-                color = token.color[1] == machine.color
-                machine_idle = not self.machines[machine_idx].busy
-                precedence = not self.jobs[job_idx].busy
-    
-                if color and machine_idle and precedence:
-                    valid = True
-    
-        return valid
+        return bool(self.mask[int(action)])
 
     def action_masks(self):
-        actions = np.arange(len(self.action_map))
-        enabled_mask = np.array(list(map(self.valid_action, actions)), dtype=bool)
-    
-        return enabled_mask
-            
+        """
+        Returns the persistent action mask (not a copy, it is updated in place by the simulator).
+        """
+        return self.mask
+        
 
     def time_tick(self):
         """
@@ -167,8 +153,7 @@ class Simulator(Petri_build):
         for machine in self.machines:
                 if  machine.token_container:
                     token = machine.token_container[0]
-                    last_logging = list(token.logging.keys())[-1]
-                    token.logging[last_logging][2] += 1
+                    self.event_log.tick(token.op_id)
 
 
     def transfer_token(self, origin, destination, clock=0):
@@ -184,12 +169,12 @@ class Simulator(Petri_build):
         if not origin.token_container:# place empty 
             return False
 
-        token = copy.copy(origin.token_container[0])
+        token = origin.token_container.popleft()
         destination.token_container.append(token)
-        origin.token_container.pop(0)
 
-        token.logging[origin.uid][1] = clock
-        token.logging[destination.uid] = [clock, 0, 0]
+        self.event_log.move(token.op_id, clock)
+        self.job_stats.move(token.op_id, clock)
+        self.lower_bounds.move(token.op_id)
 
         return True
 
@@ -212,18 +197,19 @@ class Simulator(Petri_build):
             bool: True if a transition is fired, False otherwise.
         """
         self.interaction_counter += 1
-        job_idx, machine_idx = self.action_map[int(action)] 
+        job_idx, machine_idx = self.decode_action(action) 
         
         if job_idx == None :
             return True  #handle standby action
         
-        elif action in [index for index, value in enumerate(self.action_masks()) if value]: 
+        elif self.mask[int(action)]: 
             
             selected= self.transfer_token(self.jobs[job_idx], self.ready[job_idx], self.clock)    
             allocated = self.transfer_token(self.ready[job_idx], self.machines[machine_idx], self.clock)  
              
             self.jobs[job_idx].busy = True
             self.machines[machine_idx].busy = True
+            self.update_mask(job=job_idx, machine=machine_idx)
             return selected and allocated
         
         else:
@@ -239,15 +225,16 @@ class Simulator(Petri_build):
         for  machine in self.machines: 
             if machine.token_container:
                 token = machine.token_container[0]
-                _, _, elapsed_time = list(token.logging.items())[-1][-1]
+                elapsed_time = self.event_log.elapsed(token.op_id)
                 if  elapsed_time> token.process_time  :
                     self.transfer_token(machine, self.delivery[machine.color], self.clock)
+                    self.completion_log.append((self.clock, token))
                     self.jobs[token.color[0]].busy = False
                     self.machines[token.color[1]].busy = False 
+                    self.update_mask(job=token.color[0], machine=token.color[1])
                     fired = True
                     
         self.time_tick()          
-        self.delivery_history[self.clock] = [token for place in self.delivery for token in place.token_container]
         
         return fired
 
@@ -261,15 +248,58 @@ class Simulator(Petri_build):
         
         heuristic=self.heuristics[ heuristic_id]
         action =heuristic.decide(self)
+        return self.dispatch(action)
+
+    def dispatch(self, action):
+        """
+        Fires an allocation (or the standby) and the timed transitions until a decision is needed.
+
+        Parameters:
+            action (int): Action decided by a heuristic.
+
+        Returns:
+            bool: True if a transition is fired, False otherwise.
+        """
         fired=self.fire_allocate(action)
         
-        while sum(self.action_masks()) == int (self.standby):
+        while self.mask.sum() == int (self.standby):
             self.fire_timed()
             if self.is_terminal():
                 break
             
         return fired
 
+    def macro_interact(self, heuristic_id, decisions=1, interval=None, on_completion=False):
+        """
+        Keeps dispatching with one heuristic until a trigger fires or the schedule is complete.
+
+        Parameters:
+            heuristic_id (int): Heuristic to apply.
+            decisions (int): Stop after this number of allocations (no limit if None).
+            interval (int): Stop once the clock advanced by this number of time units (no limit if None).
+            on_completion (bool): Stop once a machine completed an operation.
+
+        Returns:
+            tuple: True if any allocation was fired , and the number of allocations (the standby is not counted).
+        """
+        start_clock, completed = self.clock, len(self.completion_log)
+        allocations = 0
+        n_allocations = self.n_jobs * self.n_machines
+
+        while True:
+            action = self.heuristics[heuristic_id].decide(self)
+            allocations += bool(self.dispatch(action)) and action is not None and int(action) < n_allocations
+            if self.is_terminal():
+                break
+            if decisions is not None and allocations >= decisions:
+                break
+            if interval is not None and self.clock - start_clock >= interval:
+                break
+            if on_completion and len(self.completion_log) > completed:
+                break
+
+        return allocations > 0, allocations
+
 if __name__ == "__main__":
 
   elite=None
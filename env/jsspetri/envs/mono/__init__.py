@@ -1,3 +1,3 @@
 from jsspetri.envs.mono.simulator import Simulator
 from jsspetri.envs.mono.gym_env import MonoEnv
-
+from jsspetri.envs.mono.vector_env import MonoVectorEnv
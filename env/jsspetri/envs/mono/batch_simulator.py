@@ -0,0 +1,206 @@
+import numpy as np
+from jsspetri.common.array_build import Array_build
+
+
+class BatchSimulator(Array_build):
+    """
+    N copies of the mono simulator stepped in lockstep : the marking of every copy is a row of
+    batched NumPy arrays, the instance arrays are shared. Same behavior as
+    jsspetri.envs.mono.simulator.Simulator for every row.
+
+    Attributes:
+        num_envs (int): Number of copies.
+        clock (np.ndarray): The internal clock of every copy (num_envs).
+        interaction_counter (np.ndarray): Counter for interactions of every copy (num_envs).
+        job_next_op, job_busy (np.ndarray): Next queued operation and busy flag of every job (num_envs x n_jobs).
+        machine_op, machine_busy, machine_elapsed (np.ndarray): Operation in process, busy flag and elapsed time of every machine (num_envs x n_machines).
+        delivered (np.ndarray): Number of finished operations per machine (num_envs x n_machines).
+        op_start, op_end (np.ndarray): Time every operation entered and left its machine, -1 if not yet (num_envs x n_ops).
+        mask (np.ndarray): Action masks of every copy (num_envs x (n_machines * n_jobs + standby)).
+    """
+
+    def __init__(self,
+                 instance_id,
+                 num_envs=1,
+                 dynamic=False,
+                 standby=False,
+                 event_driven=True):
+        """
+        Initializes the batch simulator.
+
+        Parameters:
+            instanceID (str): Identifier for the JSSP instance.
+            num_envs (int): Number of copies stepped in lockstep.
+            dynamic (bool): If True, appending new operations is possible, and the termination condition is that all queues are empty.
+            event_driven (bool) : if True the clocks jump directly to the next completion instead of advancing one unit per forced standby
+        """
+        super().__init__(instance_id,
+                         dynamic=dynamic,
+                         standby=standby)
+
+        self.num_envs = num_envs
+        self.event_driven = event_driven
+        n, jobs, machines = num_envs, self.n_jobs, self.n_machines
+
+        self.clock = np.zeros(n, dtype=np.int64)
+        self.interaction_counter = np.zeros(n, dtype=np.int64)
+        self.job_next_op = np.zeros((n, jobs), dtype=np.int64)
+        self.job_busy = np.zeros((n, jobs), dtype=bool)
+        self.machine_op = np.full((n, machines), -1, dtype=np.int64)
+        self.machine_busy = np.zeros((n, machines), dtype=bool)
+        self.machine_elapsed = np.zeros((n, machines), dtype=np.int64)
+        self.delivered = np.zeros((n, machines), dtype=np.int64)
+        self.op_start = np.full((n, self.n_ops), -1, dtype=np.int64)
+        self.op_end = np.full((n, self.n_ops), -1, dtype=np.int64)
+
+        # n_machines x n_jobs allocate actions followed by the standby action , same layout as the petri simulator
+        self.n_allocations = jobs * machines
+        self.mask = np.zeros((n, self.n_allocations + int(standby)), dtype=bool)
+        self.allocate_mask = self.mask[:, :self.n_allocations].reshape(n, machines, jobs)
+        self.machine_index = np.arange(machines)[None, :, None]
+        self.env_index = np.arange(n)
+
+        self.petri_reset()
+
+    def petri_reset(self, envs=None):
+        """
+        Resets the marking of some copies.
+
+        Parameters:
+            envs: Boolean mask or indices of the copies to reset (all if None).
+        """
+        envs = slice(None) if envs is None else envs
+        self.clock[envs] = 0
+        self.interaction_counter[envs] = 0
+        self.job_next_op[envs] = self.job_first_op
+        self.job_busy[envs] = False
+        self.machine_op[envs] = -1
+        self.machine_busy[envs] = False
+        self.machine_elapsed[envs] = 0
+        self.delivered[envs] = 0
+        self.op_start[envs] = -1
+        self.op_end[envs] = -1
+        self.update_mask()
+
+    def update_mask(self):
+        """
+        Recomputes the action masks of all copies.
+        """
+        idle = (self.job_next_op < self.job_last_op) & ~self.job_busy
+        requested = np.where(idle, self.op_machine[np.minimum(self.job_next_op, self.n_ops - 1)], -1)
+        np.equal(self.machine_index, requested[:, None, :], out=self.allocate_mask)
+        self.allocate_mask &= ~self.machine_busy[:, :, None]
+        if self.standby:
+            self.mask[:, -1] = True
+
+    def action_masks(self):
+        """
+        Returns the action masks (not a copy, they are updated in place by the simulator).
+        """
+        return self.mask
+
+    def utilization_reward(self):
+        """
+        Returns:
+            np.ndarray: The utilization reward of every copy, same as the petri simulator.
+        """
+        return -(np.count_nonzero(self.machine_busy, axis=1) / self.n_machines)
+
+    def is_terminal(self):
+        """
+        Returns:
+            np.ndarray: True for the copies that reached a terminal state.
+        """
+        empty_queue = np.all(self.job_next_op == self.job_last_op, axis=1)
+        empty_machines = np.all(self.machine_op < 0, axis=1)
+        return empty_queue & empty_machines
+
+    def fire_allocate(self, actions):
+        """
+        Fires the allocation of the action of every copy.
+
+        Parameters:
+            actions (np.ndarray): Action of every copy.
+
+        Returns:
+            np.ndarray: True for the copies where a transition is fired (or standby is chosen).
+        """
+        self.interaction_counter += 1
+        standby = actions == self.n_allocations
+        allocate = self.mask[self.env_index, actions] & ~standby
+
+        envs, jobs, machines = self.env_index[allocate], actions[allocate] % self.n_jobs, actions[allocate] // self.n_jobs
+        ops = self.job_next_op[envs, jobs]
+        self.job_next_op[envs, jobs] += 1
+        self.job_busy[envs, jobs] = True
+        self.machine_op[envs, machines] = ops
+        self.machine_busy[envs, machines] = True
+        self.machine_elapsed[envs, machines] = 0
+        self.op_start[envs, ops] = self.clock[envs]
+
+        self.update_mask()
+        return allocate | standby
+
+    def fire_timed(self, envs, jump=False):
+        """
+        Fires autonomous transitions based on completion times, then advances the clocks.
+
+        Parameters:
+            envs (np.ndarray): Boolean mask of the copies to fire.
+            jump (bool): If True the copies where nothing completes jump to the next completion,
+                         which is the same as repeating fire_timed until then.
+        """
+        processing = envs[:, None] & (self.machine_op >= 0)
+        done = processing & (self.machine_elapsed > self.op_process_time[self.machine_op])
+        done_envs, done_machines = np.nonzero(done)
+        if done_envs.size:
+            ops = self.machine_op[done_envs, done_machines]
+            self.op_end[done_envs, ops] = self.clock[done_envs]
+            self.delivered[done_envs, done_machines] += 1
+            self.job_busy[done_envs, self.op_job[ops]] = False
+            self.machine_busy[done_envs, done_machines] = False
+            self.machine_op[done_envs, done_machines] = -1
+            self.update_mask()
+
+        step = np.ones(self.num_envs, dtype=np.int64)
+        if jump:
+            remaining = np.where(processing, self.op_process_time[self.machine_op] + 1 - self.machine_elapsed, np.inf).min(axis=1)
+            waiting = ~done.any(axis=1) & ~np.isinf(remaining)
+            step[waiting] = np.maximum(np.ceil(remaining[waiting]), 1)
+
+        step = np.where(envs, step, 0)
+        self.clock += step
+        self.machine_elapsed += np.where(self.machine_op >= 0, step[:, None], 0)
+
+    def interact(self, actions):
+        """
+        Performs the interactions of all copies and advances every copy until it has an enabled allocation or terminates.
+
+        Parameters:
+            actions: Action of every copy.
+
+        Returns:
+            np.ndarray: True for the copies where a transition is fired.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        fired = self.fire_allocate(actions)
+
+        #allocation does not advance time (decision step) ,-choosen standby does
+        if self.standby:
+            chosen_standby = actions == self.n_allocations
+            if chosen_standby.any():
+                self.fire_timed(chosen_standby)
+
+        # Only the idle is enabled (no action available)
+        active = ~self.mask[:, :self.n_allocations].any(axis=1)
+        while active.any():
+            self.fire_timed(active, jump=self.event_driven)
+            active &= ~self.mask[:, :self.n_allocations].any(axis=1) & ~self.is_terminal()
+
+        return fired
+
+
+if __name__ == "__main__":
+
+    sim = BatchSimulator("ta01", num_envs=4)
+    print(sim.action_masks().shape)
@@ -19,6 +19,10 @@ class MonoEnv(Env):
                  observation_depth:int =1, 
                  dynamic: bool=False,
                  standby:bool=False,
+                 auto_resolve:bool=False,
+                 mask_mode:str="all",
+                 truncation:float=None,
+                 best_makespan:int=None,
                  ):
         """
         
@@ -29,18 +33,29 @@ class MonoEnv(Env):
             render_mode (str): Rendering mode ("human" or "solution").
             instance_id (str): Identifier for the JSSP instance.
             observation_depth (int): Depth of observations in future.
+            auto_resolve (bool): If True the forced decisions (a single enabled action , standby included) are fired
+                                 without returning to the agent.
+            mask_mode (str): "all" , or "active" / "non_delay" to restrict the allocations (and the standby) to the Giffler-Thompson
+                             conflict set of the critical machine.
+            truncation (float): If given the episode is truncated as soon as clock + lower bound on the remaining makespan
+                                exceeds truncation times the best known makespan (best_makespan , else the best finished episode).
+            best_makespan (int): The best known makespan of the instance (in clock units of the simulator).
         """
         
         
+        self.auto_resolve = auto_resolve
+        self.truncation = truncation
+        self.best_makespan = best_makespan
         self.dynamic=dynamic
         self.instance_id=instance_id
 
-        self.sim = Simulator(self.instance_id,dynamic=self.dynamic,standby=standby)
+        self.sim = Simulator(self.instance_id,dynamic=self.dynamic,standby=standby,mask_mode=mask_mode)
         self.observation_depth = min(observation_depth, self.sim.n_machines)
    
          
         observation_size= 3 * self.sim.n_machines + 2 * (self.sim.n_jobs * self.observation_depth)  
         self.observation_space= spaces.Box(low=-1, high=self.sim.max_bound,shape=(observation_size,),dtype=np.int64)
+        self.observation_buffer = np.full(observation_size, -1, dtype=np.int64)   # preallocated , the dynamic padding is written once
         self.action_space = spaces.Discrete(len (self.sim.action_map))   
       
         assert render_mode is None or render_mode in self.metadata["render_modes"]
@@ -54,8 +69,9 @@ class MonoEnv(Env):
             tuple: Initial observation and info.
         """
         self.sim.petri_reset()
+        _, auto_fired = self.resolve_forced()
         observation = get_obs(self)
-        info = self._get_info(0,False,False)
+        info = self._get_info(0,False,self.sim.is_terminal(),auto_fired)
 
         return observation, info
 
@@ -78,6 +94,42 @@ class MonoEnv(Env):
         """ 
         return self.sim.action_masks()
     
+    def resolve_forced(self):
+        """
+        Fire the forced decisions (a single enabled action) while auto_resolve is on.
+        Returns:
+            tuple: Sum of the rewards of the fired actions and their number.
+        """
+        reward, auto_fired = 0, 0
+        if not self.auto_resolve:
+            return reward, auto_fired
+
+        while not self.sim.is_terminal():
+            mask = self.sim.action_masks()
+            if np.count_nonzero(mask) != 1:
+                break
+            action = int(np.argmax(mask))
+            self.sim.interact(action)
+            reward += self.reward(action)
+            auto_fired += 1
+        return reward, auto_fired
+
+    def bound_truncated(self, terminated):
+        """
+        Check if the episode can no longer finish within truncation times the best known makespan :
+        clock + lower bound on the remaining makespan (see LowerBounds) exceeds it.
+        The makespan of every finished episode updates the best known makespan.
+        Returns:
+            bool: True if the episode shall be truncated.
+        """
+        if terminated:
+            if self.best_makespan is None or self.sim.clock < self.best_makespan:
+                self.best_makespan = self.sim.clock
+            return False
+        if self.truncation is None or self.best_makespan is None:
+            return False
+        return self.sim.clock + self.sim.lower_bounds.bound() > self.truncation * self.best_makespan
+
     def step(self, action):
         """
         Take a step in the environment.
@@ -90,11 +142,14 @@ class MonoEnv(Env):
 
         fired = self.sim.interact(action)  
         reward = self.reward(action)
+        forced_reward, auto_fired = self.resolve_forced()
+        reward += forced_reward
         observation = get_obs(self)
         terminated= self.sim.is_terminal()
-        info = self._get_info(reward,fired,terminated)
+        truncated = self.bound_truncated(terminated)
+        info = self._get_info(reward,fired,terminated,auto_fired)
         
-        return observation, reward, terminated, False, info
+        return observation, reward, terminated, truncated, info
 
     def render(self,rank=False,format_="png",dpi=300):
         """
@@ -109,11 +164,11 @@ class MonoEnv(Env):
         Close the environment.
         """
 
-    def _get_info(self, reward,fired, terminated):
+    def _get_info(self, reward,fired, terminated, auto_fired=0):
         """
         Get information dictionary.
         """
-        return {"Reward": reward,"Fired":fired ,"Terminated": terminated}
+        return {"Reward": reward,"Fired":fired ,"Terminated": terminated, "AutoFired": auto_fired}
 
 if __name__ == "__main__":
     
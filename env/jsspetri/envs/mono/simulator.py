@@ -1,5 +1,6 @@
-import copy
+import numpy as np
 from jsspetri.common.petri_build import Petri_build
+from jsspetri.common.giffler_thompson import mask_modes, conflict_set, candidates
 
 class Simulator(Petri_build):
     """
@@ -8,7 +9,7 @@ class Simulator(Petri_build):
     Attributes:
         clock (int): The internal clock of the simulation.
         interaction_counter (int): Counter for interactions in the simulation.
-        delivery_history (dict): Dictionary storing the delivery history.
+        completion_log (list): (clock, token) of every finished operation, in completion order.
         action_map (dict): Mapping for actions in the simulation from discreate to multidiscreate.
 
     Methods:
@@ -20,30 +21,41 @@ class Simulator(Petri_build):
         fire_timed(): Fires timed transitions based on completion times.
         petri_interact(gui, action): Performs Petri net interactions and updates internal state.
         petri_reset(): Resets the internal state of the Petri net.
+        fork() / restore(state): Copies and restores the dynamic state for lookahead search and rollouts.
         is_terminal(): Checks if the simulation has reached a terminal state.
         action_mapping(n_machines, n_jobs): Maps multidiscrete actions to a more usable format.
+        decode_action(action): Decodes a discrete action into its (job, machine) indices.
+        reset_mask(): Rebuilds the persistent action mask from the current marking.
+        restrict_mask(): Restricts the allocations to the Giffler-Thompson conflict set of the critical machine (active / non-delay mask modes).
+        update_mask(job, machine): Updates the action mask entries touched by a job and/or a machine.
         action_masks(): Checks which allocations are enabled.
     """
 
     def __init__(self, 
                  instance_id, 
                  dynamic=False,
-                 standby=False):
+                 standby=False,
+                 mask_mode="all"):
         """
         Initializes the JSSPSimulator.
 
         Parameters:
             instanceID (str): Identifier for the JSSP instance.
             dynamic (bool): If True, appending new operations is possible, and the termination condition is that all queues are empty.
+            mask_mode (str): "all" , or "active" / "non_delay" to only enable the allocations of the Giffler-Thompson conflict
+                             set of the critical machine (active or non-delay schedules).
         """
+        assert mask_mode in mask_modes
+        self.mask_mode = mask_mode
         super().__init__(instance_id, 
                          dynamic=dynamic,
                          standby=standby)
 
         self.clock = 0
         self.interaction_counter = 0
-        self.delivery_history = {}
-        self.jobs,self.select,self.ready,self.allocate,self.machines, self.deliver,self.delivery  = [], [], [], [], [] ,[], []
+        
+        # persistent action mask : n_machines x n_jobs allocate actions followed by the standby action
+        self.init_mask(standby=self.standby)
         self.petri_reset()
         
         self.action_map = self.action_mapping(self.n_machines, self.n_jobs)
@@ -54,18 +66,9 @@ class Simulator(Petri_build):
         Resets the internal state of the Petri net.
         """
         self.clock = 0
-        for place in self.places.values():
-            place.token_container = []
-        self.add_tokens()
-   
-    
-        self.jobs = [p for p in self.places.values() if p.uid in self.filter_nodes("job")]
-        self.select = [p for p in self.transitions.values() if p.uid in self.filter_nodes("select")]
-        self.ready = [p for p in self.places.values() if p.uid in self.filter_nodes("ready")]
-        self.allocate = [t for t in self.transitions.values() if t.uid in self.filter_nodes("allocate")]
-        self.machines = [p for p in self.places.values() if p.uid in self.filter_nodes("machine")]
-        self.deliver = [t for t in self.transitions.values() if t.uid in self.filter_nodes("finish_op")]
-        self.delivery = [p for p in self.places.values() if p.uid in self.filter_nodes("finished_ops")]
+        self.restore_marking(self.initial_marking)
+        self.completion_log = []
+        self.reset_mask()
         
         
 
@@ -95,7 +98,6 @@ class Simulator(Petri_build):
              mapping_dict.update(idle)
 
          return mapping_dict
-    
 
     def utilization_reward(self):
         """
@@ -122,34 +124,44 @@ class Simulator(Petri_build):
         return empty_queue and empty_machines
     
   
-    def valid_action(self,action):
-        valid=False
-        job_idx,machine_idx=self.action_map[int(action)]
-       
-        if job_idx==None:
-            return True    
-        else :  
-            
-           if  self.jobs[job_idx].token_container:
-            token = self.jobs[job_idx].token_container[0]
-            machine = self.machines[machine_idx]
-            
-            color = token.color[1] == machine.color
-            machine = not self.machines[machine_idx].busy
-            precedence = not  self.jobs[job_idx].busy  
-            
-            if color and machine and precedence:
-                valid= True
-                    
-        return valid
-    
-    
+    def valid_action(self, action):
+        return bool(self.mask[int(action)])
+
+    def restrict_mask(self):
+        """
+        Restricts the allocations to the Giffler-Thompson conflict set of the critical machine in the active and
+        non-delay mask modes (the entries are rebuilt from the marking first).
+        The standby is enabled when no allocation is left , in the active mode also when an operation of the conflict set
+        is not available yet (waiting for it keeps the schedule active).
+        """
+        if self.mask_mode == "all":
+            return
+
+        n_jobs = self.n_jobs
+        machine_busy = np.array([place.busy for place in self.machines])
+        requested = self.requested_machine
+        idle = np.flatnonzero(requested >= 0)
+        allocatable = np.zeros(n_jobs, dtype=bool)
+        allocatable[idle] = ~machine_busy[requested[idle]]
+
+        jobs, machines, start, end = candidates(self, self.event_log.stage, self.event_log.times,
+                                                self.job_stats.next_op, self.job_stats.remaining_ops > 0, lag=1)
+        kept = conflict_set(machines, start, end, self.mask_mode, allocatable[jobs])
+        allowed = np.zeros(n_jobs, dtype=bool)
+        allowed[jobs] = kept
+
+        allocate_mask = self.mask[:n_jobs * self.n_machines].reshape(self.n_machines, n_jobs)
+        allocate_mask[:] = False
+        allocate_mask[requested[idle], idle] = (allocatable & allowed)[idle]
+        if self.standby:
+            awaited = self.mask_mode == "active" and bool((kept & (start > self.clock)).any())
+            self.mask[-1] = awaited or not allocate_mask.any()
+
     def action_masks(self):
-        actions = range(len (self.action_map))
-        enabled_mask = list(map (self.valid_action, actions))
-        
-      
-        return enabled_mask
+        """
+        Returns the persistent action mask (not a copy, it is updated in place by the simulator).
+        """
+        return self.mask
         
 
     def time_tick(self):
@@ -162,8 +174,7 @@ class Simulator(Petri_build):
         for machine in self.machines:
                 if  machine.token_container:
                     token = machine.token_container[0]
-                    last_logging = list(token.logging.keys())[-1]
-                    token.logging[last_logging][2] += 1
+                    self.event_log.tick(token.op_id)
 
 
     def transfer_token(self, origin, destination, clock=0):
@@ -179,12 +190,12 @@ class Simulator(Petri_build):
         if not origin.token_container:# place empty 
             return False
 
-        token = copy.copy(origin.token_container[0])
+        token = origin.token_container.popleft()
         destination.token_container.append(token)
-        origin.token_container.pop(0)
 
-        token.logging[origin.uid][1] = clock
-        token.logging[destination.uid] = [clock, 0, 0]
+        self.event_log.move(token.op_id, clock)
+        self.job_stats.move(token.op_id, clock)
+        self.lower_bounds.move(token.op_id)
 
         return True
 
@@ -207,18 +218,19 @@ class Simulator(Petri_build):
             bool: True if a transition is fired, False otherwise.
         """
         self.interaction_counter += 1
-        job_idx, machine_idx = self.action_map[int(action)] 
+        job_idx, machine_idx = self.decode_action(action) 
         
         if job_idx == None :
             return True  #handle standby action
         
-        elif action in [index for index, value in enumerate(self.action_masks()) if value]: 
+        elif self.mask[int(action)]: 
             
             selected= self.transfer_token(self.jobs[job_idx], self.ready[job_idx], self.clock)    
             allocated = self.transfer_token(self.ready[job_idx], self.machines[machine_idx], self.clock)   
             
             self.jobs[job_idx].busy = True
             self.machines[machine_idx].busy = True 
+            self.update_mask(job=job_idx, machine=machine_idx)
             return selected and allocated
         
         else:
@@ -234,15 +246,16 @@ class Simulator(Petri_build):
         for  machine in self.machines: 
             if machine.token_container:
                 token = machine.token_container[0]
-                _, _, elapsed_time = list(token.logging.items())[-1][-1]
+                elapsed_time = self.event_log.elapsed(token.op_id)
                 if  elapsed_time> token.process_time  :
                     self.transfer_token(machine, self.delivery[machine.color], self.clock)
+                    self.completion_log.append((self.clock, token))
                     self.jobs[token.color[0]].busy = False
                     self.machines[token.color[1]].busy = False 
+                    self.update_mask(job=token.color[0], machine=token.color[1])
                     fired = True
                     
         self.time_tick()          
-        self.delivery_history[self.clock] = [token for place in self.delivery for token in place.token_container]
         
         return fired
 
@@ -257,14 +270,16 @@ class Simulator(Petri_build):
 
         fired=self.fire_allocate(action)
         #allocation does not advance time (decision step) ,-choosen standby does  
-        if action == list(self.action_map.keys())[-1] and self.standby:
+        if action == len(self.mask) - 1 and self.standby:
             self.fire_timed()
 
         # Only the idle is enabled (no action available)
-        while sum(self.action_masks()) == int (self.standby):
+        self.restrict_mask()
+        while not self.mask[:self.n_jobs * self.n_machines].any():
             self.fire_timed()
             if self.is_terminal():
                 break
+            self.restrict_mask()
             
         return fired
 
@@ -0,0 +1,115 @@
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv, AutoresetMode
+from gymnasium.vector.utils import batch_space
+
+from jsspetri.envs.mono.batch_simulator import BatchSimulator
+from jsspetri.utils.obs_fms import get_obs_batch
+
+
+class MonoVectorEnv(VectorEnv):
+    """
+    Vectorized mono environment : num_envs episodes of the same instance stepped in lockstep by a
+    single batch simulator, finished episodes are reset in the same step.
+    """
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self,
+                 instance_id :str ,
+                 num_envs:int =8,
+                 render_mode: bool =None,
+                 observation_depth:int =1,
+                 dynamic: bool=False,
+                 standby:bool=False,
+                 event_driven:bool=True,
+                 ):
+        """
+        Initializes the vectorized environment.
+
+        Parameters:
+            instance_id (str): Identifier for the JSSP instance.
+            num_envs (int): Number of episodes stepped in lockstep.
+            observation_depth (int): Depth of observations in future.
+            event_driven (bool): If True the simulator jumps to the next completion instead of ticking one time unit at a time.
+        """
+        self.dynamic=dynamic
+        self.instance_id=instance_id
+        self.num_envs=num_envs
+
+        self.sim = BatchSimulator(self.instance_id, num_envs=num_envs, dynamic=self.dynamic, standby=standby, event_driven=event_driven)
+        self.observation_depth = min(observation_depth, self.sim.n_machines)
+
+        observation_size= 3 * self.sim.n_machines + 2 * (self.sim.n_jobs * self.observation_depth)
+        self.single_observation_space= spaces.Box(low=-1, high=self.sim.max_bound,shape=(observation_size,),dtype=np.int64)
+        self.observation_buffer = np.full((num_envs, observation_size), -1, dtype=np.int64)   # preallocated observations of the batch
+        self.single_action_space = spaces.Discrete(self.sim.mask.shape[1])
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        assert render_mode is None
+        self.render_mode = render_mode
+
+    def reset(self, seed=None, options=None):
+        """
+        Reset all the environments.
+        Returns:
+            tuple: Initial observations and info.
+        """
+        super().reset(seed=seed)
+        self.sim.petri_reset()
+        observation = get_obs_batch(self)
+        info = self._get_info(np.zeros(self.num_envs), np.zeros(self.num_envs, dtype=bool), np.zeros(self.num_envs, dtype=bool))
+
+        return observation, info
+
+    def action_masks(self):
+        """
+        Get the action masks.
+        Returns:
+            np.ndarray: Enabled actions of every environment (num_envs x n_actions).
+        """
+        return self.sim.action_masks()
+
+    def step(self, actions):
+        """
+        Take a step in all the environments , the finished ones are reset and their
+        last observation is reported in info["final_obs"].
+        Parameters:
+            actions: Action of every environment.
+        Returns:
+            tuple: New observations, rewards, termination status, truncation status, info.
+        """
+        fired = self.sim.interact(actions)
+        reward = self.sim.utilization_reward()
+        observation = get_obs_batch(self)
+        terminated = self.sim.is_terminal()
+        info = self._get_info(reward, fired, terminated)
+
+        if terminated.any():
+            final_obs = np.full(self.num_envs, None, dtype=object)
+            for env in np.flatnonzero(terminated):
+                final_obs[env] = observation[env].copy()
+            info["final_obs"], info["_final_obs"] = final_obs, terminated
+            info["final_makespan"] = np.where(terminated, self.sim.clock, 0)
+
+            self.sim.petri_reset(terminated)
+            observation[terminated] = get_obs_batch(self)[terminated]
+
+        return observation, reward, terminated, np.zeros(self.num_envs, dtype=bool), info
+
+    def close_extras(self, **kwargs):
+        """
+        Close the environment.
+        """
+
+    def _get_info(self, reward, fired, terminated):
+        """
+        Get information dictionary.
+        """
+        return {"Reward": reward, "Fired": fired, "Terminated": terminated}
+
+
+if __name__ == "__main__":
+
+    envs = MonoVectorEnv("ta01", num_envs=4)
+    print(envs.action_space)
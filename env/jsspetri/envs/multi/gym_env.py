@@ -41,6 +41,7 @@ class MultiEnv(Env):
         
         observation_size= 4 * self.sim.n_machines + 2 * (self.sim.n_jobs * self.observation_depth)  +1
         self.observation_space= spaces.Box(low=-1, high=self.sim.max_bound,shape=(observation_size,),dtype=np.int64)
+        self.observation_buffer = np.full(observation_size, -1, dtype=np.int64)   # preallocated , the dynamic padding is written once
         self.action_space = spaces.Discrete(len (self.sim.action_map))   
      
         assert render_mode is None or render_mode in self.metadata["render_modes"]
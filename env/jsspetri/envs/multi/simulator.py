@@ -1,4 +1,3 @@
-import copy
 import numpy as np
 from jsspetri.common.petri_build import Petri_build
 
@@ -9,7 +8,7 @@ class Simulator(Petri_build):
     Attributes:
         clock (int): The internal clock of the simulation.
         interaction_counter (int): Counter for interactions in the simulation.
-        delivery_history (dict): Dictionary storing the delivery history.
+        completion_log (list): (clock, token) of every finished operation, in completion order.
         action_map (dict): Mapping for actions in the simulation from discreate to multidiscreate.
 
     Methods:
@@ -21,10 +20,15 @@ class Simulator(Petri_build):
         fire_timed(): Fires timed transitions based on completion times.
         petri_interact(gui, action): Performs Petri net interactions and updates internal state.
         petri_reset(): Resets the internal state of the Petri net.
+        fork() / restore(state): Copies and restores the dynamic state for lookahead search and rollouts.
         is_terminal(): Checks if the simulation has reached a terminal state.
         action_mapping(n_machines, n_jobs): Maps multidiscrete actions to a more usable format.
+        decode_action(action): Decodes a discrete action into its (job, machine) indices.
+        reset_mask(): Rebuilds the persistent action mask from the current marking.
+        update_mask(job, machine): Updates the action mask entries touched by a job and/or a machine.
         action_masks(): Checks which allocations are enabled.
     """
+    state_attributes = Petri_build.state_attributes + ("machines_busy", "machines_idle", "energy_consumption", "interaction_timing")
 
     def __init__(self, 
                  instance_id, 
@@ -42,12 +46,13 @@ class Simulator(Petri_build):
                          standby=standby)
 
         self.action_map = self.action_mapping(self.n_machines, self.n_jobs)
-        self.jobs,self.select,self.ready,self.allocate,self.machines, self.deliver,self.delivery  = [], [], [], [], [] ,[], []
+        
+        # persistent action mask : n_machines x n_jobs allocate actions followed by the standby action
+        self.init_mask(standby=self.standby)
         self.petri_reset()
         
         self.clock = 0
         self.interaction_counter = 0
-        self.delivery_history={}
         
         self.energy_consumption=[]
         self.interaction_timing=[]
@@ -69,17 +74,9 @@ class Simulator(Petri_build):
         Resets the internal state of the Petri net.
         """
         self.clock = 0
-        for place in self.places.values():
-            place.token_container = []
-        self.add_tokens()
-   
-        self.jobs = [p for p in self.places.values() if p.uid in self.filter_nodes("job")]
-        self.select = [p for p in self.transitions.values() if p.uid in self.filter_nodes("select")]
-        self.ready = [p for p in self.places.values() if p.uid in self.filter_nodes("ready")]
-        self.allocate = [t for t in self.transitions.values() if t.uid in self.filter_nodes("allocate")]
-        self.machines = [p for p in self.places.values() if p.uid in self.filter_nodes("machine")]
-        self.deliver = [t for t in self.transitions.values() if t.uid in self.filter_nodes("finish_op")]
-        self.delivery = [p for p in self.places.values() if p.uid in self.filter_nodes("finished_ops")]
+        self.restore_marking(self.initial_marking)
+        self.completion_log = []
+        self.reset_mask()
         
 
     def action_mapping(self, n_machines, n_jobs):
@@ -108,7 +105,6 @@ class Simulator(Petri_build):
              mapping_dict.update(idle)
 
          return mapping_dict
-    
 
     def energy(self,action):  
         
@@ -129,7 +125,7 @@ class Simulator(Petri_build):
         
     def utilization(self,action): 
         
-        if action == list (self.action_map.keys())[-1] and self.standby : 
+        if action == len(self.mask) - 1 and self.standby : 
             return -1
         
         idle_machines = sum(1 for machine in self.machines if  not machine.busy) 
@@ -150,32 +146,14 @@ class Simulator(Petri_build):
         return empty_queue and empty_machines
     
   
-    def valid_action(self,action):
-        valid=False
-        job_idx,machine_idx=self.action_map[int(action)]
-       
-        if job_idx==None:
-            return True    
-        else :    
-           if  self.jobs[job_idx].token_container:
-            token = self.jobs[job_idx].token_container[0]
-            machine = self.machines[machine_idx]
-            
-            color = token.color[1] == machine.color
-            machine = not self.machines[machine_idx].busy
-            precedence = not self.jobs[job_idx].busy  
-            
-           # precedence=True                             #  ******* Precedence ignored for multi objectif 
-            
-            if color and machine and precedence:
-                valid= True        
-        return valid
-    
-    
+    def valid_action(self, action):
+        return bool(self.mask[int(action)])
+
     def action_masks(self):
-        actions = range(len (self.action_map))
-        enabled_mask = list(map (self.valid_action, actions))
-        return enabled_mask
+        """
+        Returns the persistent action mask (not a copy, it is updated in place by the simulator).
+        """
+        return self.mask
         
 
     def time_tick(self):
@@ -188,12 +166,10 @@ class Simulator(Petri_build):
         for machine in self.machines:
                 if  machine.token_container:
                     token = machine.token_container[0]
-                    last_logging = list(token.logging.keys())[-1]
-                    token.logging[last_logging][2] += 1
+                    self.event_log.tick(token.op_id)
                     
         # log the utilization of machines 
-        machine_places = [p for p in self.places.values() if p.uid in self.filter_nodes("machine")]
-        for machine in machine_places:
+        for machine in self.machines:
             if len(machine.token_container) > 0:
                 self.machines_busy[machine.color]+=1
             else:
@@ -213,12 +189,12 @@ class Simulator(Petri_build):
         if not origin.token_container:# place empty 
             return False
 
-        token = copy.copy(origin.token_container[0])
+        token = origin.token_container.popleft()
         destination.token_container.append(token)
-        origin.token_container.pop(0)
 
-        token.logging[origin.uid][1] = clock
-        token.logging[destination.uid] = [clock, 0, 0]
+        self.event_log.move(token.op_id, clock)
+        self.job_stats.move(token.op_id, clock)
+        self.lower_bounds.move(token.op_id)
         
         return True
 
@@ -241,12 +217,12 @@ class Simulator(Petri_build):
             bool: True if a transition is fired, False otherwise.
         """
         self.interaction_counter += 1
-        job_idx, machine_idx = self.action_map[int(action)] 
+        job_idx, machine_idx = self.decode_action(action) 
         
         if job_idx == None :
             return True  #handle standby action
         
-        elif action in [index for index, value in enumerate(self.action_masks()) if value]: 
+        elif self.mask[int(action)]: 
             
             selected= self.transfer_token(self.jobs[job_idx], self.ready[job_idx], self.clock)    
             allocated = self.transfer_token(self.ready[job_idx], self.machines[machine_idx], self.clock)   
@@ -254,6 +230,7 @@ class Simulator(Petri_build):
             
             self.jobs[job_idx].busy = True
             self.machines[machine_idx].busy = True 
+            self.update_mask(job=job_idx, machine=machine_idx)
             return selected and allocated
         
         else:
@@ -269,15 +246,16 @@ class Simulator(Petri_build):
         for  machine in self.machines: 
             if machine.token_container:
                 token = machine.token_container[0]
-                _, _, elapsed_time = list(token.logging.items())[-1][-1]
+                elapsed_time = self.event_log.elapsed(token.op_id)
                 if  elapsed_time>= token.process_time  :
                     self.transfer_token(machine, self.delivery[machine.color], self.clock)
+                    self.completion_log.append((self.clock, token))
                     self.jobs[token.color[0]].busy = False
                     self.machines[token.color[1]].busy = False 
+                    self.update_mask(job=token.color[0], machine=token.color[1])
                     fired = True
                     
         self.time_tick()          
-        self.delivery_history[self.clock] = [token for place in self.delivery for token in place.token_container]
         
         return fired
 
@@ -294,11 +272,11 @@ class Simulator(Petri_build):
         self.fire_allocate(action)
         
         #allocation does not advance time (decision step) ,-choosen standby does  
-        if action == list(self.action_map.keys())[-1] and self.standby:
+        if action == len(self.mask) - 1 and self.standby:
             self.fire_timed()
         
         # Only the idle is enabled (no action available) -forced standby
-        while sum(self.action_masks()) == int (self.standby):
+        while self.mask.sum() == int (self.standby):
             self.fire_timed()
             if self.is_terminal():
                 break
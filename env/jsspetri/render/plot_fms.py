@@ -26,7 +26,7 @@ def plot_solution(jssp, show_rank=False ,format_="jpg" ,dpi=300):
         "jobs": []
     }
     
-    finished_tokens = jssp.delivery_history[list(jssp.delivery_history.keys())[-1]]
+    finished_tokens = jssp.delivered_tokens()
     for token in finished_tokens:
         for machine, entry in token.logging.items():
             if machine in jssp.filter_nodes("machine"):
@@ -98,7 +98,7 @@ def plot_job(jssp,job=0 ,format_="jpg" ,dpi=300):
 
 
     #the tokens in the delivery places at the last time step :
-    finished_tokens = jssp.delivery_history[list(jssp.delivery_history.keys())[-1]] 
+    finished_tokens = jssp.delivered_tokens() 
     
     operations_list =[]
     
@@ -26,7 +26,7 @@ def plot_solution(jssp, show_rank=False ,format_="jpg" ,dpi=300):
         "jobs": []
     }
     
-    finished_tokens = jssp.delivery_history[list(jssp.delivery_history.keys())[-1]]
+    finished_tokens = jssp.delivered_tokens()
     for token in finished_tokens:
         for machine, entry in token.logging.items():
             if machine in jssp.filter_nodes("machine"):
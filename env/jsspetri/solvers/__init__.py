@@ -0,0 +1,2 @@
+from jsspetri.solvers.genetic import GeneticSolver
+from jsspetri.solvers.tabu import TabuSearch, improve
@@ -0,0 +1,241 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from jsspetri.common.decoder import Decoder
+from jsspetri.common.instance_loader import load_instance, load_trans
+from jsspetri.envs.fms.simulator import Simulator
+from jsspetri.envs.heuristic.simulator import Simulator as HeuristicSimulator
+from jsspetri.envs.heuristic.algos import init_heuristics, heuristic_index
+
+
+def evaluate(decoder, sequences):
+    """
+    Makespans of a batch of operation permutations (module level so it can run on a process pool).
+    """
+    return decoder.decode_batch(sequences)[2]
+
+
+class GeneticSolver:
+    """
+    Anytime genetic algorithm on operation permutations with repetition (see Decoder) , decoded with the timing
+    of the fms simulator (transport included). The population is seeded with the schedules of the dispatching
+    rules and evolved with a precedence preserving order crossover (POX) and swap mutations , a whole generation
+    is decoded in one batched call , optionally split over a process pool.
+
+    Attributes:
+        decoder (Decoder): The decoder of the instance.
+        best_sequence (np.ndarray): The best operation permutation found.
+        best_makespan (int): Its makespan.
+        history (list): (elapsed seconds, generation, best makespan) at every improvement.
+    """
+
+    def __init__(self,
+                 instance_id,
+                 benchmark="Taillard",
+                 trans=False,
+                 trans_layout=None,
+                 population=100,
+                 elite=0.1,
+                 mutation=0.2,
+                 tournament=2,
+                 seed=None):
+        """
+        Parameters:
+            instance_id (str): The instance.
+            benchmark (str): The benchmark folder of the instance.
+            trans (bool): If True the transport times of the layout are taken into account.
+            trans_layout: The transport layout (see load_trans) , the default layout of the benchmark if None.
+            population (int): The population size.
+            elite (float): Share of the best individuals copied to the next generation.
+            mutation (float): Probability of a swap mutation of every offspring.
+            tournament (int): Tournament size of the parent selection.
+            seed (int): Seed of the random generator.
+        """
+        self.instance_id, self.benchmark = instance_id, benchmark
+        self.trans, self.trans_layout = trans, trans_layout
+        instance, (n_jobs, n_machines, n_features, max_bound) = load_instance(instance_id, benchmark=benchmark)
+        trans_matrix = load_trans(n_machines, benchmark=benchmark, trans_layout=trans_layout) if trans else None
+        self.decoder = Decoder(instance, trans_matrix)
+
+        self.size = population
+        self.n_elite = max(1, int(elite * population))
+        self.mutation = mutation
+        self.tournament = tournament
+        self.rng = np.random.default_rng(seed)
+
+        self.best_sequence, self.best_makespan = None, None
+        self.history = []
+
+    def rule_sequences(self, labels=None, deadline=None):
+        """
+        Play the dispatching rules and read their dispatch order.
+
+        Parameters:
+            labels (list): The rules , all of them if None.
+            deadline (float): Wall-clock time (time.time()) after which no rule is played , a rule still running
+                              at the deadline is dropped. No deadline if None.
+
+        Returns:
+            np.ndarray: The operation permutation of every rule finished before the deadline (n_rules x n_ops).
+        """
+        labels = [heuristic.label for heuristic in init_heuristics(None)] if labels is None else labels
+        sequences = []
+        for label in labels:
+            sim = HeuristicSimulator(self.instance_id, benchmark=self.benchmark)
+            heuristic_id = heuristic_index(label)
+            while not sim.is_terminal() and (deadline is None or time.time() < deadline):
+                sim.interact(heuristic_id)
+            if not sim.is_terminal():
+                break
+            sequences.append(self.decoder.permutation(sim.event_log.times[:self.decoder.n_ops, sim.event_log.MACHINE, 0]))
+        return np.array(sequences, dtype=np.int64).reshape(len(sequences), self.decoder.n_ops)
+
+    def initial_population(self, labels=None, deadline=None):
+        """
+        The rule schedules played before the deadline , mutated copies of them for half of the population
+        and random permutations for the rest.
+        """
+        seeds = self.rule_sequences(labels, deadline)[:self.size]
+        n_copies = max(0, self.size // 2 - len(seeds)) if len(seeds) else 0
+        copies = self.mutate(seeds[self.rng.integers(len(seeds), size=n_copies)], probability=1)
+        randoms = self.decoder.random_sequences(self.size - len(seeds) - n_copies, self.rng)
+        return np.concatenate((seeds, copies, randoms))
+
+    def select(self, makespans, size):
+        """
+        Tournament selection.
+
+        Returns:
+            np.ndarray: Index of the winner of every tournament.
+        """
+        contestants = self.rng.integers(len(makespans), size=(size, self.tournament))
+        return contestants[np.arange(size), np.argmin(makespans[contestants], axis=1)]
+
+    def crossover(self, first, second):
+        """
+        Precedence preserving order crossover : the jobs of a random subset keep their positions of the first parent ,
+        the other jobs fill the remaining positions in the order of the second parent.
+
+        Parameters:
+            first, second (np.ndarray): The parents (pairs x n_ops).
+
+        Returns:
+            np.ndarray: The offspring.
+        """
+        kept = self.rng.random((len(first), self.decoder.n_jobs)) < 0.5
+        rows = np.arange(len(first))[:, None]
+        kept_first, kept_second = kept[rows, first], kept[rows, second]
+        child = first.copy()
+        # both parents hold the same jobs , so the row major fills line up row by row
+        child[~kept_first] = second[~kept_second]
+        return child
+
+    def mutate(self, sequences, probability=None):
+        """
+        Swap two random positions of the sequences , each with the given probability (the mutation rate if None).
+        """
+        sequences = sequences.copy()
+        probability = self.mutation if probability is None else probability
+        rows = np.flatnonzero(self.rng.random(len(sequences)) < probability)
+        first, second = self.rng.integers(self.decoder.n_ops, size=(2, len(rows)))
+        sequences[rows, first], sequences[rows, second] = sequences[rows, second], sequences[rows, first]
+        return sequences
+
+    def evaluate(self, population, pool=None, workers=1):
+        """
+        Returns:
+            np.ndarray: The makespan of every individual , evaluated in one chunk per worker on the pool if given.
+        """
+        if pool is None:
+            return evaluate(self.decoder, population)
+        chunks = np.array_split(population, workers)
+        return np.concatenate(list(pool.map(evaluate, [self.decoder] * len(chunks), chunks)))
+
+    def solve(self, time_limit=10, generations=None, workers=1, labels=None):
+        """
+        Evolve the population until the wall-clock budget or the number of generations is spent.
+
+        Parameters:
+            time_limit (float): Wall-clock budget in seconds (including the rule seeding , the rules left when it is
+                                spent are replaced by random permutations and the first generation is always evaluated).
+            generations (int): Maximum number of generations , no limit if None.
+            workers (int): Size of the process pool , the population is evaluated in this process if 1 (all the cores if None).
+            labels (list): The rules seeding the population , all of them if None.
+
+        Returns:
+            tuple: The best operation permutation and its makespan.
+        """
+        start_time = time.time()
+        workers = os.cpu_count() if workers is None else workers
+        pool = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+        try:
+            population = self.initial_population(labels, deadline=start_time + time_limit)
+            makespans = self.evaluate(population, pool, workers)
+            generation = 0
+            self.update(population, makespans, generation, start_time)
+
+            while time.time() - start_time < time_limit and (generations is None or generation < generations):
+                generation += 1
+                order = np.argsort(makespans, kind="stable")
+                n_offspring = self.size - self.n_elite
+                parents = self.select(makespans, 2 * n_offspring).reshape(2, n_offspring)
+                offspring = self.mutate(self.crossover(population[parents[0]], population[parents[1]]))
+
+                population = np.concatenate((population[order[:self.n_elite]], offspring))
+                makespans = np.concatenate((makespans[order[:self.n_elite]], self.evaluate(offspring, pool, workers)))
+                self.update(population, makespans, generation, start_time)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return self.best_sequence, self.best_makespan
+
+    def update(self, population, makespans, generation, start_time):
+        """
+        Keep the best individual of the generation if it improves the best one.
+        """
+        best = int(np.argmin(makespans))
+        if self.best_makespan is None or makespans[best] < self.best_makespan:
+            self.best_sequence, self.best_makespan = population[best].copy(), int(makespans[best])
+            self.history.append((time.time() - start_time, generation, self.best_makespan))
+
+    def schedule(self, sequence=None):
+        """
+        Replay an operation permutation in the fms simulator , selecting every job as soon as it is free and allocating
+        every operation at its decoded start , so the token logs hold the schedule the render module plots
+        (e.g. render.plot_fms.plot_solution(solver.schedule())).
+
+        Parameters:
+            sequence (np.ndarray): The operation permutation , the best one found if None.
+
+        Returns:
+            Simulator: The finished simulation.
+        """
+        sequence = self.best_sequence if sequence is None else sequence
+        start = self.decoder.decode(sequence)[0]
+        sim = Simulator(self.instance_id, benchmark=self.benchmark, trans=self.trans, trans_layout=self.trans_layout)
+        n_jobs, n_allocations = sim.n_jobs, sim.n_jobs * (sim.n_machines + 1)
+
+        while not sim.is_terminal():
+            sim.fire_timed()
+            fired = True
+            while fired:
+                enabled = np.flatnonzero(sim.action_masks()[:n_allocations])
+                due = [action for action in enabled.tolist() if action < n_jobs
+                       or start[sim.ready[(action - n_jobs) % n_jobs].token_container[0].op_id] == sim.clock]
+                for action in due:
+                    sim.fire_controlled(action)
+                fired = bool(due)
+            if sim.action_masks().any():
+                sim.time_tick()
+
+        return sim
+
+
+if __name__ == "__main__":
+
+    solver = GeneticSolver("ta01", seed=0)
+    sequence, makespan = solver.solve(time_limit=10)
+    print(f"ta01: makespan {makespan} , improvements {solver.history}")
@@ -0,0 +1,414 @@
+import time
+import heapq
+import numpy as np
+
+from jsspetri.common.decoder import Decoder
+from jsspetri.envs.fms.simulator import Simulator as FmsSimulator
+from jsspetri.envs.fms.array_simulator import ArraySimulator
+
+neighborhoods = ("N5", "N7")
+
+
+class TabuSearch:
+    """
+    Tabu search on the disjunctive graph of a schedule (machine sequences) , with the timing of the Decoder :
+    every operation lasts process_time + lag + gap , the job arcs add the transport time of their target.
+
+    The heads (longest path to an operation) and tails (longest path from its end) give the makespan and the critical
+    path , the moves reorder the critical blocks (N5 : swap the first or last two operations of the blocks ,
+    N7 : move an operation of a block to its front or back and the block ends inside the block). A move is evaluated
+    from the heads and tails of the reordered segment only , the chosen move is applied by sorting again the part of
+    the topological order spanned by the segment and propagating the heads forward and the tails backward from it.
+
+    Attributes:
+        decoder (Decoder): The decoder of the instance.
+        sequences (list): The op_ids processed by every machine , in processing order (current solution).
+        head, tail (list): The heads and tails of every operation in the current solution.
+        order, index (list): A topological order of the operations and the position of every operation in it.
+        makespan (int): The makespan of the current solution.
+        best_sequences (list): The machine sequences of the best solution found.
+        best_makespan (int): Its makespan.
+        history (list): (elapsed seconds, iteration, best makespan) at every improvement.
+    """
+
+    def __init__(self, decoder, machine_sequences, neighborhood="N7", tenure=None, seed=None):
+        """
+        Parameters:
+            decoder (Decoder): The decoder of the instance (with the transport and timing of the simulator).
+            machine_sequences (list): The initial machine sequences (e.g. Decoder.machine_sequences of a schedule).
+            neighborhood (str): "N5" or "N7".
+            tenure (int): Number of iterations a reversed precedence stays tabu , 10 + n_jobs / n_machines if None.
+            seed (int): Seed of the random tenure.
+        """
+        assert neighborhood in neighborhoods
+        self.decoder = decoder
+        self.neighborhood = neighborhood
+        self.tenure = 10 + decoder.n_jobs // decoder.n_machines if tenure is None else tenure
+        self.rng = np.random.default_rng(seed)
+
+        n_ops = decoder.n_ops
+        self.duration = (decoder.op_process_time + decoder.lag + decoder.gap).tolist()
+        self.trans = decoder.op_trans_time.tolist()
+        self.op_machine = decoder.op_machine.tolist()
+        self.job_prev = [-1] * n_ops
+        self.job_next = [-1] * n_ops
+        job_n_ops = np.bincount(decoder.op_job, minlength=decoder.n_jobs).tolist()
+        for first, n in zip(decoder.job_first_op.tolist(), job_n_ops):
+            for op in range(first, first + n - 1):
+                self.job_next[op], self.job_prev[op + 1] = op + 1, op
+        # every path ends on the last operation of a job
+        self.last_ops = [first + n - 1 for first, n in zip(decoder.job_first_op.tolist(), job_n_ops) if n > 0]
+
+        self.sequences = [list(map(int, ops)) for ops in machine_sequences]
+        self.machine_prev = [-1] * n_ops
+        self.machine_next = [-1] * n_ops
+        self.position = [0] * n_ops
+        for ops in self.sequences:
+            self.link(ops, 0, len(ops))
+        if not self.update():
+            raise ValueError("The machine sequences contradict the job orders (cyclic schedule)")
+
+        self.tabu = {}
+        self.best_sequences = [list(ops) for ops in self.sequences]
+        self.best_makespan = self.makespan
+        self.history = []
+
+    @classmethod
+    def from_simulator(cls, sim, **kwargs):
+        """
+        Start from the schedule of a finished episode (the machine entry times of the event log).
+
+        Parameters:
+            sim: The simulator of a FmsEnv or MonoEnv (the fms simulators have no completion lag).
+        """
+        lag = 0 if isinstance(sim, (FmsSimulator, ArraySimulator)) else 1
+        decoder = Decoder.from_simulator(sim, lag=lag, gap=lag)
+        times = sim.op_logging if isinstance(sim, ArraySimulator) else sim.event_log.times
+        return cls(decoder, decoder.machine_sequences(times[:decoder.n_ops, 2, 0]), **kwargs)
+
+    def link(self, ops, first, last):
+        """
+        Update the machine arcs and positions of a range of a machine sequence.
+        """
+        for index in range(first, last):
+            op = ops[index]
+            self.position[op] = index
+            self.machine_prev[op] = ops[index - 1] if index > 0 else -1
+            self.machine_next[op] = ops[index + 1] if index + 1 < len(ops) else -1
+
+    def update(self):
+        """
+        Recompute the heads , tails and makespan in topological order.
+
+        Returns:
+            bool: False if the graph has a cycle (the heads are not valid).
+        """
+        n_ops, duration, trans = self.decoder.n_ops, self.duration, self.trans
+        job_prev, job_next, machine_prev, machine_next = self.job_prev, self.job_next, self.machine_prev, self.machine_next
+
+        count = [(job_prev[op] >= 0) + (machine_prev[op] >= 0) for op in range(n_ops)]
+        stack = [op for op in range(n_ops) if count[op] == 0]
+        order = []
+        while stack:
+            op = stack.pop()
+            order.append(op)
+            for successor in (job_next[op], machine_next[op]):
+                if successor >= 0:
+                    count[successor] -= 1
+                    if count[successor] == 0:
+                        stack.append(successor)
+        if len(order) < n_ops:
+            return False
+
+        head, tail = [0] * n_ops, [0] * n_ops
+        for op in order:
+            job, machine = job_prev[op], machine_prev[op]
+            head[op] = max(head[job] + duration[job] + trans[op] if job >= 0 else 0,
+                           head[machine] + duration[machine] if machine >= 0 else 0)
+        for op in reversed(order):
+            job, machine = job_next[op], machine_next[op]
+            tail[op] = max(duration[job] + tail[job] + trans[job] if job >= 0 else 0,
+                           duration[machine] + tail[machine] if machine >= 0 else 0)
+
+        self.order, self.head, self.tail = order, head, tail
+        self.index = [0] * n_ops
+        for index, op in enumerate(order):
+            self.index[op] = index
+        self.measure()
+        return True
+
+    def measure(self):
+        """
+        Update the length of the longest path and the makespan from the heads of the last operations of the jobs
+        (in clock units of the simulators , see Decoder).
+        """
+        head, duration = self.head, self.duration
+        self.length = max((head[op] + duration[op] for op in self.last_ops), default=0)
+        self.makespan = self.length - self.decoder.gap + 1
+
+    def reorder(self, segment):
+        """
+        Sort again the part of the topological order spanned by the operations of a reordered machine segment
+        (the arcs changed by a move all join operations of this part).
+
+        Parameters:
+            segment (list): The operations of the segment.
+
+        Returns:
+            bool: False if the graph has a cycle (the order is left unchanged).
+        """
+        index, job_prev, job_next, machine_prev, machine_next = self.index, self.job_prev, self.job_next, self.machine_prev, self.machine_next
+        first = min(index[op] for op in segment)
+        last = max(index[op] for op in segment)
+        window = self.order[first:last + 1]
+        inside = set(window)
+
+        count = {op: (job_prev[op] in inside) + (machine_prev[op] in inside) for op in window}
+        stack = [op for op in reversed(window) if count[op] == 0]
+        order = []
+        while stack:
+            op = stack.pop()
+            order.append(op)
+            for successor in (job_next[op], machine_next[op]):
+                if successor in inside:
+                    count[successor] -= 1
+                    if count[successor] == 0:
+                        stack.append(successor)
+        if len(order) < len(window):
+            return False
+
+        self.order[first:last + 1] = order
+        for position, op in enumerate(order, first):
+            index[op] = position
+        return True
+
+    def propagate(self, changed_heads, changed_tails):
+        """
+        Recompute the heads forward and the tails backward in topological order , from the operations whose
+        predecessors (successors) changed , only following the operations whose value changed.
+
+        Parameters:
+            changed_heads (list): The operations with new predecessors.
+            changed_tails (list): The operations with new successors.
+        """
+        index, duration, trans, head, tail = self.index, self.duration, self.trans, self.head, self.tail
+        job_prev, job_next, machine_prev, machine_next = self.job_prev, self.job_next, self.machine_prev, self.machine_next
+
+        queue = [(index[op], op) for op in set(changed_heads)]
+        queued = set(changed_heads)
+        heapq.heapify(queue)
+        while queue:
+            op = heapq.heappop(queue)[1]
+            job, machine = job_prev[op], machine_prev[op]
+            value = max(head[job] + duration[job] + trans[op] if job >= 0 else 0,
+                        head[machine] + duration[machine] if machine >= 0 else 0)
+            if value != head[op] or op in changed_heads:
+                head[op] = value
+                for successor in (job_next[op], machine_next[op]):
+                    if successor >= 0 and successor not in queued:
+                        queued.add(successor)
+                        heapq.heappush(queue, (index[successor], successor))
+
+        queue = [(-index[op], op) for op in set(changed_tails)]
+        queued = set(changed_tails)
+        heapq.heapify(queue)
+        while queue:
+            op = heapq.heappop(queue)[1]
+            job, machine = job_next[op], machine_next[op]
+            value = max(duration[job] + tail[job] + trans[job] if job >= 0 else 0,
+                        duration[machine] + tail[machine] if machine >= 0 else 0)
+            if value != tail[op] or op in changed_tails:
+                tail[op] = value
+                for predecessor in (job_prev[op], machine_prev[op]):
+                    if predecessor >= 0 and predecessor not in queued:
+                        queued.add(predecessor)
+                        heapq.heappush(queue, (-index[predecessor], predecessor))
+        self.measure()
+
+    def critical_blocks(self):
+        """
+        Walk a critical path back from its last operation , preferring the machine arcs.
+
+        Returns:
+            list: The critical blocks (maximal runs of the path on one machine , single operations included)
+                  as (machine, first position, last position).
+        """
+        head, duration, trans = self.head, self.duration, self.trans
+        op = max(self.last_ops, key=lambda op: head[op] + duration[op])
+        path = [op]
+        while True:
+            machine, job = self.machine_prev[op], self.job_prev[op]
+            if machine >= 0 and head[machine] + duration[machine] == head[op]:
+                op = machine
+            elif job >= 0 and head[job] + duration[job] + trans[op] == head[op]:
+                op = job
+            else:
+                break
+            path.append(op)
+        path.reverse()
+
+        blocks, first = [], 0
+        for index in range(1, len(path) + 1):
+            if index == len(path) or self.machine_prev[path[index]] != path[index - 1]:
+                blocks.append((self.op_machine[path[first]], self.position[path[first]], self.position[path[index - 1]]))
+                first = index
+        return blocks
+
+    def moves(self, blocks):
+        """
+        The moves of the neighborhood on the critical blocks.
+
+        Returns:
+            list: (machine, position, new position) of every move.
+        """
+        moves = set()
+        last = len(blocks) - 1
+        for index, (machine, first, end) in enumerate(blocks):
+            if end == first:
+                continue
+            if index > 0:
+                moves.add((machine, first + 1, first))
+            if index < last:
+                moves.add((machine, end - 1, end))
+            if self.neighborhood == "N7":
+                for position in range(first + 1, end):
+                    moves.update(((machine, position, first), (machine, position, end),
+                                  (machine, first, position), (machine, end, position)))
+                moves.update(((machine, first + 1, first), (machine, end - 1, end)))
+        return sorted(moves)
+
+    def reordered(self, machine, position, target):
+        """
+        Returns:
+            tuple: The first position of the segment changed by the move and its new operation order.
+        """
+        ops = self.sequences[machine]
+        if position < target:
+            return position, ops[position + 1:target + 1] + [ops[position]]
+        return target, [ops[position]] + ops[target:position]
+
+    def estimate(self, machine, position, target):
+        """
+        Estimate the makespan after a move from the heads and tails around the reordered segment
+        (exact for the longest paths through the segment , the rest of the graph keeps its heads and tails).
+        """
+        head, tail, duration, trans = self.head, self.tail, self.duration, self.trans
+        first, segment = self.reordered(machine, position, target)
+        before = self.sequences[machine][first - 1] if first > 0 else -1
+        after = self.sequences[machine][first + len(segment)] if first + len(segment) < len(self.sequences[machine]) else -1
+
+        heads, previous = [], before
+        for op in segment:
+            job = self.job_prev[op]
+            value = max(head[job] + duration[job] + trans[op] if job >= 0 else 0,
+                        (heads[-1] if heads else head[previous]) + duration[previous] if previous >= 0 else 0)
+            heads.append(value)
+            previous = op
+
+        length, following, value = 0, after, 0
+        for op, op_head in zip(reversed(segment), reversed(heads)):
+            job = self.job_next[op]
+            value = max(duration[job] + tail[job] + trans[job] if job >= 0 else 0,
+                        duration[following] + (value if following != after else tail[following]) if following >= 0 else 0)
+            length = max(length, op_head + duration[op] + value)
+            following = op
+        return length - self.decoder.gap + 1
+
+    def reversed_pairs(self, machine, position, target):
+        """
+        Returns:
+            list: The precedences (a, b) created by the move , a before b on the machine.
+        """
+        ops = self.sequences[machine]
+        op = ops[position]
+        if position < target:
+            return [(other, op) for other in ops[position + 1:target + 1]]
+        return [(op, other) for other in ops[target:position]]
+
+    def apply(self, machine, position, target):
+        """
+        Move an operation of a machine sequence and update the graph around the reordered segment.
+
+        Returns:
+            bool: False if the move made the graph cyclic (the move is undone).
+        """
+        ops = self.sequences[machine]
+        ops.insert(target, ops.pop(position))
+        first, last = min(position, target), max(position, target)
+        self.link(ops, max(first - 1, 0), min(last + 2, len(ops)))
+        segment = ops[first:last + 1]
+        if self.reorder(segment):
+            before = [ops[first - 1]] if first > 0 else []
+            after = [ops[last + 1]] if last + 1 < len(ops) else []
+            self.propagate(segment + after, before + segment)
+            return True
+        ops.insert(position, ops.pop(target))
+        self.link(ops, max(first - 1, 0), min(last + 2, len(ops)))
+        return False
+
+    def solve(self, time_limit=1, iterations=None):
+        """
+        Run the tabu search until the time limit or the number of iterations is spent , or no move is left
+        (a single critical block is optimal).
+
+        Parameters:
+            time_limit (float): Wall-clock budget in seconds.
+            iterations (int): Maximum number of iterations , no limit if None.
+
+        Returns:
+            tuple: The machine sequences of the best solution and its makespan.
+        """
+        start_time = time.time()
+        iteration = 0
+        while time.time() - start_time < time_limit and (iterations is None or iteration < iterations):
+            iteration += 1
+            moves = self.moves(self.critical_blocks())
+            if not moves:
+                break
+
+            candidates = sorted((self.estimate(*move), move) for move in moves)
+            allowed = [(value, move) for value, move in candidates
+                       if value < self.best_makespan or not any(self.tabu.get(pair, 0) >= iteration
+                                                                 for pair in self.reversed_pairs(*move))]
+            for value, move in allowed or candidates[:1]:
+                forbidden = [(b, a) for a, b in self.reversed_pairs(*move)]
+                if self.apply(*move):
+                    expiry = iteration + self.tenure + int(self.rng.integers(0, 3))
+                    self.tabu.update((pair, expiry) for pair in forbidden)
+                    break
+
+            if self.makespan < self.best_makespan:
+                self.best_sequences = [list(ops) for ops in self.sequences]
+                self.best_makespan = self.makespan
+                self.history.append((time.time() - start_time, iteration, self.best_makespan))
+
+        return self.best_sequences, self.best_makespan
+
+    def schedule(self, sequences=None):
+        """
+        Decode machine sequences (the best ones found if None).
+
+        Returns:
+            tuple: The start and end time of every operation (indexed by op_id) and the makespan , see Decoder.decode.
+        """
+        sequences = self.best_sequences if sequences is None else sequences
+        return self.decoder.decode(self.decoder.from_machine_sequences(sequences))
+
+
+def improve(env, time_limit=1, **kwargs):
+    """
+    Improve the schedule of a finished FmsEnv or MonoEnv episode.
+
+    Parameters:
+        env: The environment , after the last step of an episode.
+        time_limit (float): Wall-clock budget in seconds.
+        **kwargs: The parameters of TabuSearch (neighborhood , tenure , seed).
+
+    Returns:
+        TabuSearch: The search , holding the best machine sequences and makespan (see TabuSearch.schedule).
+    """
+    if not env.sim.is_terminal():
+        raise ValueError("The episode is not finished")
+    search = TabuSearch.from_simulator(env.sim, **kwargs)
+    search.solve(time_limit=time_limit)
+    return search
@@ -1,48 +1,111 @@
 import numpy as np
 
+def queued_operations(sim, waiting, queued):
+    """
+    Get the machine and the processing time of the waiting operations of the job queues.
+
+    Parameters:
+        sim: The simulator (op_machine and op_process_time arrays indexed by op_id).
+        waiting (np.ndarray): op_id of every queue slot.
+        queued (np.ndarray): True for the slots holding an operation of the queue.
+
+    Returns:
+        tuple: Machine and processing time of every slot (0 for the empty slots and if there is no operation at all).
+    """
+    if len(sim.op_machine) == 0:   # e.g. an instance or dynamic state without operations
+        return np.zeros(waiting.shape, dtype=np.int64), np.zeros(waiting.shape, dtype=np.int64)
+    waiting = np.minimum(waiting, len(sim.op_machine) - 1)
+    return np.where(queued, sim.op_machine[waiting], 0), np.where(queued, sim.op_process_time[waiting], 0)
+
 def get_obs(env):
     """
-    Get the observation of the state.
+    Get the observation of the state , read from the event log in the preallocated buffer of the env
+    (the dynamic padding is written once with the buffer).
+
+    Returns:
+        np.ndarray: Observation array.
+    """
+    sim, log = env.sim, env.sim.event_log
+    n_machines, n_jobs, depth = sim.n_machines, sim.n_jobs, env.observation_depth
+    observation = env.observation_buffer
+
+    # Get the state of the machines, i.e., remaining time (a machine holds at most one operation):
+    machines = observation[:2 * n_machines].reshape(n_machines, 2)
+    ops = np.flatnonzero(log.stage == log.MACHINE)
+    machines[:, 0] = np.arange(n_machines)
+    machines[:, 1] = 0
+    machines[sim.op_machine[ops], 1] = np.maximum(sim.op_process_time[ops] - log.times[ops, log.MACHINE, 2], 0)
+
+    # Get the waiting operation in the jobs depending on the depth (from the next operation of the job statistics):
+    jobs = observation[2 * n_machines:2 * n_machines + 2 * depth * n_jobs].reshape(depth, n_jobs, 2)
+    waiting = sim.job_stats.next_op[None, :] + np.arange(depth)[:, None]
+    queued = waiting < sim.job_last_op[None, :]
+    jobs[..., 0], jobs[..., 1] = queued_operations(sim, waiting, queued)
+    start = 2 * n_machines + 2 * depth * n_jobs
+
+    # Get the number of deliverd operation
+    observation[start:start + n_machines] = np.bincount(sim.op_machine[log.stage == log.DELIVERY], minlength=n_machines)
+
+    return observation.copy()
+
+def get_obs_array(env):
+    """
+    Get the observation of the state from the marking arrays of the array simulator,
+    same layout and buffer as get_obs.
 
     Returns:
         np.ndarray: Observation array.
     """
-    observation = []
+    sim = env.sim
+    n_machines, n_jobs, depth = sim.n_machines, sim.n_jobs, env.observation_depth
+    observation = env.observation_buffer
+
     # Get the state of the machines, i.e., remaining time :
-    for m in range(env.sim.n_machines) :
-       if len (env.sim.machines[m].token_container) == 0:
-           observation.extend([env.sim.machines[m].color,0])
-       else:
-           in_process=env.sim.machines[m].token_container[0]
-           remaining_time =in_process.process_time - in_process.logging[list(in_process.logging.keys())[-1]][2]
-           observation.extend([env.sim.machines[m].color, remaining_time if remaining_time  >=0  else 0])
-           
+    machines = observation[:2 * n_machines].reshape(n_machines, 2)
+    processing = sim.machine_op >= 0
+    ops = sim.machine_op[processing]
+    machines[:, 0] = np.arange(n_machines)
+    machines[:, 1] = 0
+    machines[processing, 1] = np.maximum(sim.op_process_time[ops] - sim.op_logging[ops, 2, 2], 0)
+
     # Get the waiting operation in the jobs depending on the depth:
-    for level in range(env.observation_depth):
-       for j in range(env.sim.n_jobs) :
-           if env.sim.jobs[j].token_container and level < len(env.sim.jobs[j].token_container):
-               observation.extend([env.sim.jobs[j].token_container[level].color[1], env.sim.jobs[j].token_container[level].process_time])
-           else:
-               observation.extend([0, 0])
-               
-               
-    # # Get the ready operations :
-    # for level in range(env.observation_depth):
-    #    for j in range(env.sim.n_jobs) :
-    #        if env.sim.jobs[j].token_container and level < len(env.sim.jobs[j].token_container):
-    #            observation.extend([env.sim.jobs[j].token_container[level].color[1], env.sim.jobs[j].token_container[level].process_time])
-    #        else:
-    #            observation.extend([0, 0])
-                  
-                  
-                            
-    # Get the number of deliverd operation 
-    for delivery in env.sim.delivery:
-       observation.append(len ( delivery.token_container))
-              
-    # if dynamic fill the rest of the observation with -1   
-    if env.dynamic :
-        for  i in range(len(observation),env.observation_space.shape[0]):  
-           observation.append(-1)
-           
-    return np.array(observation, dtype=np.int64)
\ No newline at end of file
+    jobs = observation[2 * n_machines:2 * n_machines + 2 * depth * n_jobs].reshape(depth, n_jobs, 2)
+    waiting = sim.job_next_op[None, :] + np.arange(depth)[:, None]
+    queued = waiting < sim.job_last_op[None, :]
+    jobs[..., 0], jobs[..., 1] = queued_operations(sim, waiting, queued)
+    start = 2 * n_machines + 2 * depth * n_jobs
+
+    # Get the number of deliverd operation
+    observation[start:start + n_machines] = sim.delivered
+
+    return observation.copy()
+
+def get_obs_batch(env):
+    """
+    Get the observations of all the copies of a batch simulator in the preallocated buffer of the vector env,
+    same layout as get_obs (shared by the fms and mono vector envs , their batch simulators hold the same arrays).
+
+    Returns:
+        np.ndarray: Observation array (num_envs x observation size).
+    """
+    sim = env.sim
+    n_machines, n_jobs, depth = sim.n_machines, sim.n_jobs, env.observation_depth
+    observation = env.observation_buffer
+
+    # Get the state of the machines, i.e., remaining time :
+    machines = observation[:, :2 * n_machines].reshape(sim.num_envs, n_machines, 2)
+    remaining_time = np.where(sim.machine_op >= 0, sim.op_process_time[sim.machine_op] - sim.machine_elapsed, 0)
+    machines[..., 0] = np.arange(n_machines)
+    machines[..., 1] = np.maximum(remaining_time, 0)
+
+    # Get the waiting operation in the jobs depending on the depth:
+    jobs = observation[:, 2 * n_machines:2 * n_machines + 2 * depth * n_jobs].reshape(sim.num_envs, depth, n_jobs, 2)
+    waiting = sim.job_next_op[:, None, :] + np.arange(depth)[None, :, None]
+    queued = waiting < sim.job_last_op
+    jobs[..., 0], jobs[..., 1] = queued_operations(sim, waiting, queued)
+    start = 2 * n_machines + 2 * depth * n_jobs
+
+    # Get the number of deliverd operation
+    observation[:, start:start + n_machines] = sim.delivered
+
+    return observation.copy()
@@ -1,47 +1,39 @@
 import numpy as np
+from jsspetri.utils.obs_fms import queued_operations
 
 def get_obs(env):
     """
-    Get the observation of the state.
+    Get the observation of the state , read from the event log in the preallocated buffer of the env
+    (the dynamic padding is written once with the buffer).
 
     Returns:
         np.ndarray: Observation array.
     """
-    observation = []
-    # Get the state of the machines, i.e., remaining time :
-    for m in range(env.sim.n_machines) :
-       if len (env.sim.machines[m].token_container) == 0:
-           observation.extend([env.sim.machines[m].color,0])
-       else:
-           in_process=env.sim.machines[m].token_container[0]
-           remaining_time =in_process.process_time - in_process.logging[list(in_process.logging.keys())[-1]][2]
-           observation.extend([env.sim.machines[m].color, remaining_time if remaining_time  >=0  else 0])
-           
-    # Get the waiting operation in the jobs depending on the depth:
-    for level in range(env.observation_depth):
-       for j in range(env.sim.n_jobs) :
-           if env.sim.jobs[j].token_container and level < len(env.sim.jobs[j].token_container):
-               observation.extend([env.sim.jobs[j].token_container[level].color[1], env.sim.jobs[j].token_container[level].process_time])
-           else:
-               observation.extend([0, 0])
+    sim, log = env.sim, env.sim.event_log
+    n_machines, n_jobs, depth = sim.n_machines, sim.n_jobs, env.observation_depth
+    observation = env.observation_buffer
 
-    #Get total consumption:    
-    consumption=0
-    busy_machines= ~np.array( [machine.idle for machine in env.sim.machines])
-    consumption =  np.dot(busy_machines , env.sim.machines_powers)
-    observation.append(consumption)
- 
-    #Get consumption per machine:       
-    for idx,machine in enumerate(env.sim.machines):
-       observation.append(not machine.idle * env.sim.machines_powers[idx])
-                               
-    # Get the number of deliverd operation 
-    for delivery in env.sim.delivery:
-       observation.append(len ( delivery.token_container))
-              
-    # if dynamic fill the rest of the observation with -1   
-    if env.dynamic :
-        for  i in range(len(observation),env.observation_space.shape[0]):  
-           observation.append(-1)
-           
-    return np.array(observation, dtype=np.int64)
\ No newline at end of file
+    # Get the state of the machines, i.e., remaining time (a machine holds at most one operation):
+    machines = observation[:2 * n_machines].reshape(n_machines, 2)
+    ops = np.flatnonzero(log.stage == log.MACHINE)
+    machines[:, 0] = np.arange(n_machines)
+    machines[:, 1] = 0
+    machines[sim.op_machine[ops], 1] = np.maximum(sim.op_process_time[ops] - log.times[ops, log.MACHINE, 2], 0)
+
+    # Get the waiting operation in the jobs depending on the depth (from the next operation of the job statistics):
+    jobs = observation[2 * n_machines:2 * n_machines + 2 * depth * n_jobs].reshape(depth, n_jobs, 2)
+    waiting = sim.job_stats.next_op[None, :] + np.arange(depth)[:, None]
+    queued = waiting < sim.job_last_op[None, :]
+    jobs[..., 0], jobs[..., 1] = queued_operations(sim, waiting, queued)
+    start = 2 * n_machines + 2 * depth * n_jobs
+
+    #Get total consumption and consumption per machine:
+    consumption = np.array([machine.busy for machine in sim.machines]) * sim.machines_powers
+    observation[start] = consumption.sum()
+    observation[start + 1:start + 1 + n_machines] = consumption
+    start += 1 + n_machines
+
+    # Get the number of deliverd operation
+    observation[start:start + n_machines] = np.bincount(sim.op_machine[log.stage == log.DELIVERY], minlength=n_machines)
+
+    return observation.copy()